@@ -0,0 +1,179 @@
+"""
+Long-range analytics over the whole session history, computed with NumPy
+
+Every function works on the columns of the in-memory session store, so a
+decade of sessions is a handful of vectorized passes rather than a Python
+loop per row. Days are local calendar days; ranges are YYYY-MM-DD, end
+inclusive.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from database import get_segment_map
+from session_store import DAY, day_name, get_session_store
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def _columns(start_date: str, end_date: str) -> dict:
+    columns = get_session_store().columns(start_date, end_date)
+    return {
+        "start": np.frombuffer(columns["start"], dtype=np.int64),
+        "duration": np.frombuffer(columns["duration"], dtype=np.uint16).astype(np.int64),
+        "segment": np.frombuffer(columns["segment"], dtype=np.uint32),
+        "focus": np.frombuffer(columns["focus"], dtype=np.uint8),
+    }
+
+
+def _day_number(day: str) -> int:
+    return (date.fromisoformat(day) - date(1970, 1, 1)).days
+
+
+def _daily_totals(start_date: str, end_date: str) -> tuple:
+    # Day numbers for every calendar day in the range, with zero-filled
+    # session counts and minutes
+    cols = _columns(start_date, end_date)
+    first, last = _day_number(start_date), _day_number(end_date)
+    days = np.arange(first, last + 1)
+    index = cols["start"] // DAY - first
+    counts = np.bincount(index, minlength=len(days))
+    minutes = np.bincount(index, weights=cols["duration"], minlength=len(days))
+    return days, counts, minutes
+
+
+def _period_index(day_numbers: np.ndarray, period: str) -> np.ndarray:
+    if period == "week":
+        # Monday-based weeks, numbered from the epoch
+        return (day_numbers + _EPOCH_WEEKDAY) // 7
+    if period == "month":
+        return day_numbers.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    raise ValueError("period must be week or month")
+
+
+def _period_label(index: int, period: str) -> str:
+    # Weeks are labelled by their Monday, months as YYYY-MM
+    if period == "week":
+        return day_name((index * 7 - _EPOCH_WEEKDAY) * DAY)
+    return str(np.datetime64(index, "M"))
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    # Trailing mean; the first window-1 days average over what exists so far
+    sums = np.cumsum(np.concatenate(([0.0], values)))
+    ends = np.arange(1, len(values) + 1)
+    begins = np.maximum(ends - window, 0)
+    return (sums[ends] - sums[begins]) / (ends - begins)
+
+
+def streaks(start_date: str, end_date: str) -> dict:
+    """Current and longest runs of consecutive days with at least one session."""
+    cols = _columns(start_date, end_date)
+    days = np.unique(cols["start"] // DAY)
+    if not len(days):
+        return {"current": 0, "longest": 0, "longest_start": None, "longest_end": None, "active_days": 0}
+
+    # Runs of consecutive days split wherever the gap is more than one day
+    breaks = np.flatnonzero(np.diff(days) != 1) + 1
+    run_starts = np.concatenate(([0], breaks))
+    run_ends = np.concatenate((breaks, [len(days)])) - 1
+    lengths = run_ends - run_starts + 1
+    best = int(np.argmax(lengths))
+
+    # The current streak survives until a whole day passes without a session
+    last_day = _day_number(end_date)
+    current = int(lengths[-1]) if days[-1] >= last_day - 1 else 0
+
+    return {
+        "current": current,
+        "longest": int(lengths[best]),
+        "longest_start": day_name(int(days[run_starts[best]]) * DAY),
+        "longest_end": day_name(int(days[run_ends[best]]) * DAY),
+        "active_days": int(len(days)),
+    }
+
+
+def rolling_averages(start_date: str, end_date: str, windows: tuple = (7, 30)) -> dict:
+    """Per-day cycles and minutes with trailing averages, as parallel arrays."""
+    days, counts, minutes = _daily_totals(start_date, end_date)
+    return {
+        "days": [day_name(int(day) * DAY) for day in days],
+        "count": counts.tolist(),
+        "minutes": minutes.astype(np.int64).tolist(),
+        "averages": {
+            str(window): {
+                "count": np.round(_rolling_mean(counts, window), 2).tolist(),
+                "minutes": np.round(_rolling_mean(minutes, window), 1).tolist(),
+            }
+            for window in windows
+        },
+    }
+
+
+def segment_trends(start_date: str, end_date: str, period: str = "week") -> dict:
+    """
+    Minutes per segment per week or month, plus each segment's linear trend
+    (change in minutes per period) fitted over the whole range.
+    """
+    cols = _columns(start_date, end_date)
+    day_numbers = np.arange(_day_number(start_date), _day_number(end_date) + 1)
+    periods = np.unique(_period_index(day_numbers, period))
+    labels = [_period_label(int(index), period) for index in periods]
+
+    registry = get_segment_map()
+    segment_ids = np.array(sorted(registry), dtype=np.int64)
+
+    # One bincount over (segment, period) cells gives the whole matrix
+    known = np.isin(cols["segment"], segment_ids)
+    rows = np.searchsorted(segment_ids, cols["segment"][known])
+    columns = np.searchsorted(periods, _period_index(cols["start"][known] // DAY, period))
+    matrix = np.bincount(
+        rows * len(periods) + columns,
+        weights=cols["duration"][known],
+        minlength=len(segment_ids) * len(periods)
+    ).reshape(len(segment_ids), len(periods))
+
+    # Least-squares slope of every segment's series at once
+    x = np.arange(len(periods), dtype=np.float64)
+    x -= x.mean()
+    denominator = (x ** 2).sum()
+    if denominator:
+        slopes = (matrix - matrix.mean(axis=1, keepdims=True)) @ x / denominator
+    else:
+        slopes = np.zeros(len(segment_ids))
+
+    return {
+        "period": period,
+        "periods": labels,
+        "segments": [
+            {
+                "id": int(segment_id),
+                "name": registry[int(segment_id)]["name"],
+                "color": registry[int(segment_id)]["color"],
+                "minutes": matrix[i].astype(np.int64).tolist(),
+                "total_minutes": int(matrix[i].sum()),
+                "trend_minutes_per_period": round(float(slopes[i]), 2),
+            }
+            for i, segment_id in enumerate(segment_ids)
+        ],
+    }
+
+
+def hour_weekday_heatmap(start_date: str, end_date: str) -> dict:
+    """Sessions and minutes by weekday (rows, Monday first) x start hour (columns)."""
+    cols = _columns(start_date, end_date)
+    weekday = (cols["start"] // DAY + _EPOCH_WEEKDAY) % 7
+    hour = cols["start"] % DAY // 3600
+    cells = weekday * 24 + hour
+    counts = np.bincount(cells, minlength=7 * 24).reshape(7, 24)
+    minutes = np.bincount(cells, weights=cols["duration"], minlength=7 * 24).reshape(7, 24)
+    return {
+        "weekdays": WEEKDAYS,
+        "hours": list(range(24)),
+        "count": counts.tolist(),
+        "minutes": minutes.astype(np.int64).tolist(),
+    }
@@ -0,0 +1,181 @@
+"""
+Benchmark scenarios for database.py and the dashboard API.
+
+    python -m benchmarks.run --years 5 --per-day 10 --output bench.json
+
+Builds a synthetic history in a temporary database, times each scenario and
+prints a JSON report (p50/p95 latency in ms, peak traced memory in KiB) that
+can be diffed across commits.
+"""
+
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import database
+from benchmarks.synthetic import DEFAULT_MIX, parse_mix, populate
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(fn, iterations: int) -> dict:
+    """Time fn over several calls, then trace one extra call for peak memory."""
+    fn()  # warm-up
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _dashboard_scenarios() -> dict:
+    try:
+        import dashboard
+    except ImportError:
+        return {}
+    client = dashboard.app.test_client()
+
+    def api_month_cold():
+        dashboard._response_cache.clear()
+        client.get('/api/month')
+
+    return {
+        "api_month": api_month_cold,
+        "api_month_cached": lambda: client.get('/api/month'),
+    }
+
+
+def _store_scenarios() -> dict:
+    from session_store import get_session_store
+    
+    store = get_session_store()
+    end = date.today().isoformat()
+    return {
+        "session_store_totals_all": lambda: store.totals("1970-01-01", end),
+        "session_store_by_day_all": lambda: store.by_day("1970-01-01", end),
+        "session_store_by_segment_all": lambda: store.by_segment("1970-01-01", end),
+    }
+
+
+def _analytics_scenarios() -> dict:
+    try:
+        import analytics
+    except ImportError:
+        return {}
+    end = date.today().isoformat()
+    start = (date.today() - timedelta(days=3650)).isoformat()
+    return {
+        "analytics_streaks": lambda: analytics.streaks(start, end),
+        "analytics_rolling": lambda: analytics.rolling_averages(start, end),
+        "analytics_trends": lambda: analytics.segment_trends(start, end),
+        "analytics_heatmap": lambda: analytics.hour_weekday_heatmap(start, end),
+    }
+
+
+def _save_session_throughput(count: int) -> dict:
+    segment_id = database.get_segments()[0]["id"]
+    start = time.perf_counter()
+    for _ in range(count):
+        database.save_session(segment_id, "benchmark", 25, datetime.now())
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": count,
+        "seconds": round(elapsed, 3),
+        "sessions_per_sec": round(count / elapsed, 1),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(years: float, sessions_per_day: float, mix: dict, seed: int, iterations: int, writes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        sessions = populate(
+            Path(tmp) / "bench.db", years=years, sessions_per_day=sessions_per_day,
+            mix=mix, end_date=date.today(), seed=seed
+        )
+        load_seconds = time.perf_counter() - start
+
+        past_day = (date.today() - timedelta(days=200)).isoformat()
+        scenarios = {
+            "get_today_stats": database.get_today_stats,
+            "get_weekly_stats": database.get_weekly_stats,
+            "get_today_sessions_by_time_segment": database.get_today_sessions_by_time_segment,
+            "get_sessions_by_time_bucket_past_day": lambda: database.get_sessions_by_time_bucket(past_day, past_day),
+            **_store_scenarios(),
+            **_analytics_scenarios(),
+            **_dashboard_scenarios(),
+        }
+        results = {name: measure(fn, iterations) for name, fn in scenarios.items()}
+        results["save_session"] = _save_session_throughput(writes)
+        database.close_connections()
+
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "dataset": {
+            "years": years,
+            "sessions_per_day": sessions_per_day,
+            "mix": mix,
+            "seed": seed,
+            "sessions": sessions,
+            "load_seconds": round(load_seconds, 3),
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pomodoro tracker as history grows")
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--per-day", type=float, default=8, help="Mean sessions per day")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. Work=0.5,Learn=0.5")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per scenario")
+    parser.add_argument("--writes", type=int, default=200, help="Sessions saved in the save_session scenario")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.years, args.per_day, args.mix, args.seed, args.iterations, args.writes)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Cold-start cost of each main.py mode.
+
+    python -m benchmarks.startup --runs 10
+
+Each run is a fresh interpreter that performs a mode's startup work up to the
+point main.py would enter the Tk main loop or start serving: importing the
+mode's modules and making the first database call. Runs are repeated against
+a brand-new database (schema created) and an existing one (schema current).
+Interpreter startup alone is reported as a baseline. Output is JSON.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+MODES = {
+    "baseline": "pass",
+    "timer-only": "import timer_widget, database; database.get_segments()",
+    "dashboard-only": "import dashboard, database; database.get_segments()",
+    "combined": "import dashboard, timer_widget, database; database.get_segments()",
+}
+
+
+def _run(code: str, home: str) -> float:
+    env = {**os.environ, "HOME": home}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(runs: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, code in MODES.items():
+            cold, warm = [], []
+            for i in range(runs):
+                home = os.path.join(tmp, f"{mode}-{i}")
+                os.makedirs(home)
+                cold.append(_run(code, home))
+                warm.append(_run(code, home))
+            results[mode] = {
+                "cold_p50_ms": round(statistics.median(cold), 1),
+                "warm_p50_ms": round(statistics.median(warm), 1),
+                "warm_min_ms": round(min(warm), 1),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup time of each main.py mode")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps({"runs": args.runs, "modes": measure(args.runs)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Deterministic synthetic history for benchmarks.
+
+    python -m benchmarks.synthetic --db /tmp/pomodoro-bench.db --years 5 --per-day 10
+"""
+
+import argparse
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+import database
+
+DEFAULT_MIX = {"Work": 0.4, "Solve": 0.2, "Build": 0.15, "Learn": 0.15, "Chill": 0.1}
+
+
+def parse_mix(text: str) -> dict:
+    """Parse 'Work=0.5,Learn=0.5' into a segment mix."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def generate_sessions(
+    segment_ids: dict,
+    years: float = 2,
+    sessions_per_day: float = 8,
+    mix: dict = None,
+    end_date: date = None,
+    seed: int = 42
+) -> Iterator[dict]:
+    """Yield sessions day by day up to end_date; same arguments, same history."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    names = [name for name in mix if name in segment_ids]
+    weights = [mix[name] for name in names]
+    end_date = end_date or date.today()
+    day = end_date - timedelta(days=int(years * 365) - 1)
+
+    while day <= end_date:
+        count = max(0, round(rng.gauss(sessions_per_day, sessions_per_day / 4)))
+        # Sessions start between 06:00 and 01:00, spread over the day in order
+        minutes = sorted(rng.randrange(6 * 60, 25 * 60) for _ in range(count))
+        for minute in minutes:
+            name = rng.choices(names, weights)[0]
+            yield {
+                "segment_id": segment_ids[name],
+                "description": f"{name} session {rng.randrange(10000)}",
+                "duration_minutes": 25,
+                "focus_rating": rng.randint(1, 5),
+                "started_at": datetime.combine(day, datetime.min.time()) + timedelta(minutes=minute),
+            }
+        day += timedelta(days=1)
+
+
+def populate(db_path: Path, **options) -> int:
+    """Point database at db_path, create the schema and bulk-load a history."""
+    database.DB_PATH = Path(db_path)
+    database.init_db()
+    segment_ids = {s["name"]: s["id"] for s in database.get_segments()}
+    return database.save_sessions_bulk(generate_sessions(segment_ids, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic pomodoro history")
+    parser.add_argument("--db", required=True, help="SQLite file to create or extend")
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--per-day", type=float, default=8, help="Mean sessions per day")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. Work=0.5,Learn=0.5")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    inserted = populate(
+        args.db, years=args.years, sessions_per_day=args.per_day,
+        mix=args.mix, end_date=args.end_date, seed=args.seed
+    )
+    print(f"Inserted {inserted} sessions into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Count timer widget event-loop wakeups per minute in each timer state.
+
+    python -m benchmarks.wakeups --seconds 20
+
+Needs a display. Every callback the widget schedules through root.after /
+root.after_idle is counted when it runs, attributed to the state the timer
+was in at that moment; the report is JSON, scaled to wakeups per minute.
+"""
+
+import argparse
+import json
+import tempfile
+import tkinter as tk
+from pathlib import Path
+
+import database
+
+STATES = ["idle", "running", "paused", "break"]
+
+
+def _instrument(app, counts: dict):
+    root = app.root
+
+    def counted(callback):
+        def wrapper(*args):
+            counts[app.state] = counts.get(app.state, 0) + 1
+            return callback(*args)
+        return wrapper
+
+    root.after = lambda ms, func=None, *args: tk.Misc.after(root, ms, counted(func), *args)
+    root.after_idle = lambda func, *args: tk.Misc.after_idle(root, counted(func), *args)
+
+
+def measure(seconds: float) -> dict:
+    from timer_widget import PomodoroTimer
+
+    app = PomodoroTimer()
+    counts = {}
+    _instrument(app, counts)
+
+    # Each step puts the timer in the next state, then lets it sit there
+    steps = [
+        lambda: None,                # idle
+        app._toggle_timer,           # running
+        app._toggle_timer,           # paused
+        app._start_break,            # break
+    ]
+
+    def step(i: int = 0):
+        if i == len(steps):
+            app._quit()
+            return
+        steps[i]()
+        tk.Misc.after(app.root, int(seconds * 1000), step, i + 1)
+
+    tk.Misc.after(app.root, 0, step)
+    app.run()
+
+    return {
+        state: {
+            "wakeups": counts.get(state, 0),
+            "wakeups_per_minute": round(counts.get(state, 0) * 60 / seconds, 1),
+        }
+        for state in STATES
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure timer widget wakeups per state")
+    parser.add_argument("--seconds", type=float, default=60, help="Time spent in each state")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = Path(tmp) / "wakeups.db"
+        database.init_db()
+        report = measure(args.seconds)
+        database.close_connections()
+    print(json.dumps({"seconds_per_state": args.seconds, "states": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
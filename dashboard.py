@@ -1,637 +1,232 @@
-from flask import Flask, render_template_string, jsonify
+import csv
+import gzip
+import hashlib
+import io
+import json
+import signal
+import sys
+import threading
+import time
+import zlib
+from functools import wraps
+from pathlib import Path
+from flask import Flask, Response, abort, current_app, g, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+import metrics
 from database import (
     get_today_stats, 
     get_weekly_stats, 
     get_today_sessions_by_time_segment,
-    get_sessions_by_date_range
+    get_sessions_by_time_bucket,
+    get_time_bucket_sessions,
+    get_time_buckets,
+    DAY_PAGE_SIZE,
+    get_period_stats,
+    get_segment_map,
+    search_sessions,
+    SEARCH_PAGE_SIZE,
+    get_data_version,
+    iter_sessions,
+    wait_for_data_change
 )
 from datetime import datetime, timedelta
 
-app = Flask(__name__)
-
-DASHBOARD_HTML = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🍅 Pomodoro Analytics</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'SF Pro', 'Segoe UI', Roboto, sans-serif;
-            background: #0a0a0a;
-            color: #ffffff;
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-        }
-        
-        header {
-            text-align: center;
-            margin-bottom: 30px;
-            padding: 20px 0;
-        }
-        
-        header h1 {
-            font-size: 2.2rem;
-            font-weight: 600;
-            margin-bottom: 8px;
-        }
-        
-        header p {
-            color: #888;
-            font-size: 0.95rem;
-        }
-        
-        /* Tabs */
-        .tabs {
-            display: flex;
-            gap: 10px;
-            margin-bottom: 30px;
-            border-bottom: 2px solid #222;
-            padding-bottom: 0;
-        }
-        
-        .tab {
-            padding: 12px 24px;
-            background: transparent;
-            border: none;
-            color: #888;
-            font-size: 1rem;
-            font-weight: 500;
-            cursor: pointer;
-            border-bottom: 3px solid transparent;
-            transition: all 0.3s;
-        }
-        
-        .tab:hover {
-            color: #fff;
-            background: rgba(255, 255, 255, 0.05);
-        }
-        
-        .tab.active {
-            color: #fff;
-            border-bottom-color: #667eea;
-        }
-        
-        .tab-content {
-            display: none;
-        }
-        
-        .tab-content.active {
-            display: block;
-            animation: fadeIn 0.3s;
-        }
-        
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(10px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        /* Summary Stats */
-        .summary-stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-            gap: 15px;
-            margin-bottom: 30px;
-        }
-        
-        .stat-card {
-            background: #1a1a1a;
-            border: 1px solid #2a2a2a;
-            border-radius: 12px;
-            padding: 20px;
-            text-align: center;
-        }
-        
-        .stat-card .value {
-            font-size: 2.2rem;
-            font-weight: 700;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin-bottom: 5px;
-        }
-        
-        .stat-card .label {
-            color: #888;
-            font-size: 0.85rem;
-        }
-        
-        /* Time Segments */
-        .time-segments {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .time-segment {
-            background: #1a1a1a;
-            border: 1px solid #2a2a2a;
-            border-radius: 12px;
-            padding: 20px;
-        }
-        
-        .time-segment h3 {
-            font-size: 1.1rem;
-            margin-bottom: 8px;
-            color: #fff;
-        }
-        
-        .time-segment .segment-stats {
-            color: #888;
-            font-size: 0.85rem;
-            margin-bottom: 15px;
-        }
-        
-        .session-item {
-            background: #0f0f0f;
-            border-left: 3px solid;
-            padding: 10px 12px;
-            margin-bottom: 8px;
-            border-radius: 4px;
-            font-size: 0.9rem;
-        }
-        
-        .session-item .time {
-            color: #888;
-            font-size: 0.8rem;
-            margin-bottom: 3px;
-        }
-        
-        .session-item .segment-name {
-            font-weight: 600;
-            margin-bottom: 2px;
-        }
-        
-        .session-item .description {
-            color: #aaa;
-            font-size: 0.85rem;
-        }
-        
-        .empty-state {
-            text-align: center;
-            color: #666;
-            padding: 40px 20px;
-            font-size: 0.9rem;
-        }
-        
-        /* Weekly View */
-        .daily-grid {
-            display: grid;
-            grid-template-columns: repeat(7, 1fr);
-            gap: 15px;
-            margin-bottom: 30px;
-        }
-        
-        .day-card {
-            background: #1a1a1a;
-            border: 1px solid #2a2a2a;
-            border-radius: 12px;
-            padding: 15px;
-            text-align: center;
-        }
-        
-        .day-card .day-name {
-            color: #888;
-            font-size: 0.8rem;
-            margin-bottom: 5px;
-        }
-        
-        .day-card .day-date {
-            color: #fff;
-            font-size: 0.9rem;
-            margin-bottom: 10px;
-        }
-        
-        .day-card .day-count {
-            font-size: 1.8rem;
-            font-weight: 700;
-            color: #667eea;
-        }
-        
-        .day-card .day-hours {
-            color: #888;
-            font-size: 0.75rem;
-            margin-top: 5px;
-        }
-        
-        /* Segment Breakdown */
-        .segment-breakdown {
-            background: #1a1a1a;
-            border: 1px solid #2a2a2a;
-            border-radius: 12px;
-            padding: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .segment-breakdown h3 {
-            font-size: 1.1rem;
-            margin-bottom: 15px;
-        }
-        
-        .segment-row {
-            display: flex;
-            align-items: center;
-            margin-bottom: 12px;
-        }
-        
-        .segment-row .color-dot {
-            width: 12px;
-            height: 12px;
-            border-radius: 50%;
-            margin-right: 10px;
-        }
-        
-        .segment-row .name {
-            flex: 1;
-            font-size: 0.9rem;
-        }
-        
-        .segment-row .count {
-            font-weight: 600;
-            margin-right: 10px;
-        }
-        
-        .segment-row .percentage {
-            color: #888;
-            font-size: 0.85rem;
-        }
-        
-        /* Month View - Heatmap */
-        .heatmap {
-            background: #1a1a1a;
-            border: 1px solid #2a2a2a;
-            border-radius: 12px;
-            padding: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .heatmap h3 {
-            font-size: 1.1rem;
-            margin-bottom: 15px;
-        }
-        
-        .calendar-grid {
-            display: grid;
-            grid-template-columns: repeat(7, 1fr);
-            gap: 8px;
-        }
-        
-        .calendar-day {
-            aspect-ratio: 1;
-            background: #0f0f0f;
-            border-radius: 6px;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            font-size: 0.8rem;
-            border: 1px solid #222;
-        }
-        
-        .calendar-day .date {
-            color: #888;
-            font-size: 0.75rem;
-        }
-        
-        .calendar-day .count {
-            font-weight: 600;
-            margin-top: 2px;
-        }
-        
-        .calendar-day.intensity-0 { background: #0f0f0f; }
-        .calendar-day.intensity-1 { background: rgba(102, 126, 234, 0.2); }
-        .calendar-day.intensity-2 { background: rgba(102, 126, 234, 0.4); }
-        .calendar-day.intensity-3 { background: rgba(102, 126, 234, 0.6); }
-        .calendar-day.intensity-4 { background: rgba(102, 126, 234, 0.8); }
-        .calendar-day.intensity-5 { background: rgba(102, 126, 234, 1); }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>🍅 Pomodoro Analytics</h1>
-            <p>Track your laptop usage and productivity</p>
-        </header>
-        
-        <!-- Tabs -->
-        <div class="tabs">
-            <button class="tab active" onclick="switchTab('day')">Day</button>
-            <button class="tab" onclick="switchTab('week')">Week</button>
-            <button class="tab" onclick="switchTab('month')">Month</button>
-        </div>
-        
-        <!-- Day View -->
-        <div id="day-tab" class="tab-content active">
-            <div class="summary-stats">
-                <div class="stat-card">
-                    <div class="value" id="today-cycles">0</div>
-                    <div class="label">Cycles Today</div>
-                </div>
-                <div class="stat-card">
-                    <div class="value" id="today-hours">0.0</div>
-                    <div class="label">Hours</div>
-                </div>
-            </div>
-            
-            <div class="time-segments" id="time-segments">
-                <!-- Populated by JS -->
-            </div>
-        </div>
-        
-        <!-- Week View -->
-        <div id="week-tab" class="tab-content">
-            <div class="summary-stats">
-                <div class="stat-card">
-                    <div class="value" id="week-cycles">0</div>
-                    <div class="label">Cycles This Week</div>
-                </div>
-                <div class="stat-card">
-                    <div class="value" id="week-hours">0.0</div>
-                    <div class="label">Hours</div>
-                </div>
-                <div class="stat-card">
-                    <div class="value" id="week-avg">0</div>
-                    <div class="label">Avg/Day</div>
-                </div>
-            </div>
-            
-            <div class="daily-grid" id="daily-grid">
-                <!-- Populated by JS -->
-            </div>
-            
-            <div class="segment-breakdown">
-                <h3>Segment Breakdown</h3>
-                <div id="week-segments">
-                    <!-- Populated by JS -->
-                </div>
-            </div>
-        </div>
-        
-        <!-- Month View -->
-        <div id="month-tab" class="tab-content">
-            <div class="summary-stats">
-                <div class="stat-card">
-                    <div class="value" id="month-cycles">0</div>
-                    <div class="label">Cycles This Month</div>
-                </div>
-                <div class="stat-card">
-                    <div class="value" id="month-hours">0.0</div>
-                    <div class="label">Hours</div>
-                </div>
-                <div class="stat-card">
-                    <div class="value" id="month-best">0</div>
-                    <div class="label">Best Day</div>
-                </div>
-            </div>
-            
-            <div class="heatmap">
-                <h3 id="month-title">January 2025</h3>
-                <div class="calendar-grid" id="calendar-grid">
-                    <!-- Populated by JS -->
-                </div>
-            </div>
-            
-            <div class="segment-breakdown">
-                <h3>Segment Breakdown</h3>
-                <div id="month-segments">
-                    <!-- Populated by JS -->
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        // Tab switching
-        function switchTab(tab) {
-            // Update tab buttons
-            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-            event.target.classList.add('active');
-            
-            // Update tab content
-            document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
-            document.getElementById(tab + '-tab').classList.add('active');
-            
-            // Load data for the tab
-            if (tab === 'day') loadDayData();
-            else if (tab === 'week') loadWeekData();
-            else if (tab === 'month') loadMonthData();
-        }
-        
-        // Load day view data
-        async function loadDayData() {
-            const response = await fetch('/api/today');
-            const data = await response.json();
-            
-            document.getElementById('today-cycles').textContent = data.total_pomodoros;
-            document.getElementById('today-hours').textContent = data.total_hours;
-            
-            // Render time segments
-            const container = document.getElementById('time-segments');
-            container.innerHTML = '';
-            
-            const segments = ['morning', 'afternoon', 'evening', 'midnight'];
-            const labels = {
-                'morning': 'Morning (6 AM - 12 PM)',
-                'afternoon': 'Afternoon (12 PM - 6 PM)',
-                'evening': 'Evening (6 PM - 12 AM)',
-                'midnight': 'Midnight (12 AM - 6 AM)'
-            };
-            
-            segments.forEach(seg => {
-                const segData = data.time_segments[seg];
-                const div = document.createElement('div');
-                div.className = 'time-segment';
-                
-                let sessionsHtml = '';
-                if (segData.sessions.length === 0) {
-                    sessionsHtml = '<div class="empty-state">No sessions yet</div>';
-                } else {
-                    segData.sessions.forEach(session => {
-                        const startTime = new Date(session.started_at).toLocaleTimeString('en-US', {
-                            hour: 'numeric',
-                            minute: '2-digit',
-                            hour12: true
-                        });
-                        const endTime = new Date(new Date(session.started_at).getTime() + session.duration_minutes * 60000).toLocaleTimeString('en-US', {
-                            hour: 'numeric',
-                            minute: '2-digit',
-                            hour12: true
-                        });
-                        
-                        sessionsHtml += `
-                            <div class="session-item" style="border-left-color: ${session.segment_color}">
-                                <div class="time">${startTime} - ${endTime}</div>
-                                <div class="segment-name">${session.segment_name}</div>
-                                <div class="description">${session.description}</div>
-                            </div>
-                        `;
-                    });
-                }
-                
-                div.innerHTML = `
-                    <h3>${labels[seg]}</h3>
-                    <div class="segment-stats">${segData.count} cycles • ${(segData.minutes / 60).toFixed(1)} hrs</div>
-                    ${sessionsHtml}
-                `;
-                
-                container.appendChild(div);
-            });
-        }
-        
-        // Load week view data
-        async function loadWeekData() {
-            const response = await fetch('/api/week');
-            const data = await response.json();
-            
-            document.getElementById('week-cycles').textContent = data.total_pomodoros;
-            document.getElementById('week-hours').textContent = data.total_hours;
-            document.getElementById('week-avg').textContent = Math.round(data.total_pomodoros / 7);
-            
-            // Render daily grid
-            const container = document.getElementById('daily-grid');
-            container.innerHTML = '';
-            
-            const days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
-            const startDate = new Date(data.week_start);
-            
-            for (let i = 0; i < 7; i++) {
-                const date = new Date(startDate);
-                date.setDate(startDate.getDate() + i);
-                const dateStr = date.toISOString().split('T')[0];
-                const dayData = data.daily[dateStr] || { count: 0, minutes: 0 };
-                
-                const div = document.createElement('div');
-                div.className = 'day-card';
-                div.innerHTML = `
-                    <div class="day-name">${days[i]}</div>
-                    <div class="day-date">${date.getDate()}</div>
-                    <div class="day-count">${dayData.count}</div>
-                    <div class="day-hours">${(dayData.minutes / 60).toFixed(1)} hrs</div>
-                `;
-                container.appendChild(div);
-            }
-            
-            // Render segment breakdown
-            const segContainer = document.getElementById('week-segments');
-            segContainer.innerHTML = '';
-            
-            data.segments.forEach(seg => {
-                const percentage = Math.round((seg.count / data.total_pomodoros) * 100) || 0;
-                const div = document.createElement('div');
-                div.className = 'segment-row';
-                div.innerHTML = `
-                    <div class="color-dot" style="background: ${seg.color}"></div>
-                    <div class="name">${seg.name}</div>
-                    <div class="count">${seg.count} cycles</div>
-                    <div class="percentage">${percentage}%</div>
-                `;
-                segContainer.appendChild(div);
-            });
-        }
-        
-        // Load month view data
-        async function loadMonthData() {
-            const response = await fetch('/api/month');
-            const data = await response.json();
-            
-            document.getElementById('month-cycles').textContent = data.total_pomodoros;
-            document.getElementById('month-hours').textContent = data.total_hours;
-            document.getElementById('month-best').textContent = data.best_day_count;
-            document.getElementById('month-title').textContent = data.month_name;
-            
-            // Render calendar heatmap
-            const container = document.getElementById('calendar-grid');
-            container.innerHTML = '';
-            
-            const firstDay = new Date(data.month_start);
-            const lastDay = new Date(data.month_end);
-            const startDayOfWeek = firstDay.getDay() === 0 ? 6 : firstDay.getDay() - 1; // Monday = 0
-            
-            // Add empty cells for days before month starts
-            for (let i = 0; i < startDayOfWeek; i++) {
-                const div = document.createElement('div');
-                div.className = 'calendar-day';
-                container.appendChild(div);
-            }
-            
-            // Add days of month
-            const currentDate = new Date(firstDay);
-            while (currentDate <= lastDay) {
-                const dateStr = currentDate.toISOString().split('T')[0];
-                const dayData = data.daily[dateStr] || { count: 0 };
-                
-                // Calculate intensity (0-5 based on count)
-                let intensity = 0;
-                if (dayData.count > 0) intensity = 1;
-                if (dayData.count >= 3) intensity = 2;
-                if (dayData.count >= 5) intensity = 3;
-                if (dayData.count >= 7) intensity = 4;
-                if (dayData.count >= 10) intensity = 5;
-                
-                const div = document.createElement('div');
-                div.className = `calendar-day intensity-${intensity}`;
-                div.innerHTML = `
-                    <div class="date">${currentDate.getDate()}</div>
-                    <div class="count">${dayData.count}</div>
-                `;
-                container.appendChild(div);
-                
-                currentDate.setDate(currentDate.getDate() + 1);
-            }
-            
-            // Render segment breakdown
-            const segContainer = document.getElementById('month-segments');
-            segContainer.innerHTML = '';
-            
-            data.segments.forEach(seg => {
-                const percentage = Math.round((seg.count / data.total_pomodoros) * 100) || 0;
-                const div = document.createElement('div');
-                div.className = 'segment-row';
-                div.innerHTML = `
-                    <div class="color-dot" style="background: ${seg.color}"></div>
-                    <div class="name">${seg.name}</div>
-                    <div class="count">${seg.count} cycles</div>
-                    <div class="percentage">${percentage}%</div>
-                `;
-                segContainer.appendChild(div);
-            });
-        }
-        
-        // Initial load
-        loadDayData();
-        
-        // Auto-refresh every 30 seconds
-        setInterval(() => {
-            const activeTab = document.querySelector('.tab.active').textContent.toLowerCase();
-            if (activeTab === 'day') loadDayData();
-            else if (activeTab === 'week') loadWeekData();
-            else if (activeTab === 'month') loadMonthData();
-        }, 30000);
-    </script>
-</body>
-</html>
-"""
+try:
+    import brotli
+except ImportError:  # optional; gzip alone covers every browser
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify through orjson; anything it can't encode falls back to Flask's rules."""
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+
+    def response(self, *args, **kwargs):
+        # Same arguments as jsonify: one value, several (a list) or keywords
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        obj = kwargs or (args[0] if len(args) == 1 else list(args) or None)
+        body = orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+        return current_app.response_class(body, mimetype=self.mimetype)
+
+
+# Front-end files are served from /assets by serve_asset below
+app = Flask(__name__, static_folder=None)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+REQUEST_SECONDS = metrics.Histogram(
+    "pomodoro_http_request_seconds", "Dashboard request latency by route"
+)
+REQUESTS = metrics.Counter(
+    "pomodoro_http_requests_total", "Dashboard requests by route and status"
+)
+CACHE_LOOKUPS = metrics.Counter(
+    "pomodoro_response_cache_lookups_total", "API response cache lookups by result"
+)
+
+
+def _cache_hit_ratio() -> float:
+    hits = CACHE_LOOKUPS.get(result='hit')
+    misses = CACHE_LOOKUPS.get(result='miss')
+    return round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+
+metrics.Gauge(
+    "pomodoro_response_cache_hit_ratio", "Share of API response cache lookups served from cache",
+    _cache_hit_ratio
+)
+
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+
+# Asset names carry a hash of their contents, so a cached copy never goes stale
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# name -> (mimetype, etag, {content coding: body}), built on first use; the
+# page itself is stored under 'index.html'
+_assets = None
+_assets_lock = threading.Lock()
+
+
+def _encodings(body: bytes, gzip_level: int = 9, brotli_quality: int = 11) -> dict:
+    encoded = {'identity': body, 'gzip': gzip.compress(body, gzip_level, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body, quality=brotli_quality)
+    return encoded
+
+
+def _build_assets() -> dict:
+    assets = {}
+    page = (STATIC_DIR / 'index.html').read_text(encoding='utf-8')
+    for name, mimetype in (('dashboard.css', 'text/css'), ('dashboard.js', 'text/javascript')):
+        body = (STATIC_DIR / name).read_bytes()
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        stem, ext = name.rsplit('.', 1)
+        hashed = f"{stem}.{etag[:12]}.{ext}"
+        assets[hashed] = (mimetype, etag, _encodings(body))
+        page = page.replace(f'/assets/{name}', f'/assets/{hashed}')
+    body = page.encode('utf-8')
+    assets['index.html'] = ('text/html', hashlib.blake2b(body, digest_size=8).hexdigest(), _encodings(body))
+    return assets
+
+
+def load_assets() -> dict:
+    """Read, fingerprint and compress the front-end files once per process."""
+    global _assets
+    with _assets_lock:
+        if _assets is None:
+            _assets = _build_assets()
+    return _assets
+
+
+def _encoded_response(mimetype: str, etag: str, encoded: dict) -> Response:
+    # Picks the smallest coding the client accepts; each has its own ETag
+    coding = request.accept_encodings.best_match(
+        [c for c in ('br', 'gzip') if c in encoded]
+    ) or 'identity'
+    if coding != 'identity':
+        etag = f"{etag}-{coding}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(encoded[coding], mimetype=mimetype)
+        if coding != 'identity':
+            response.content_encoding = coding
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+# (path + query, day) -> (data version, etag, {content coding: body}); every
+# view below depends only on the current day and the database contents
+_response_cache = {}
+RESPONSE_CACHE_SIZE = 64
+
+# API bodies smaller than this go out uncompressed; levels favour speed, since
+# a body is compressed again whenever the data changes
+COMPRESS_MIN_SIZE = 1024
+API_GZIP_LEVEL = 6
+API_BROTLI_QUALITY = 5
+
+
+def cached_api(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.full_path, datetime.now().strftime("%Y-%m-%d"))
+        version = get_data_version()
+        
+        entry = _response_cache.get(key)
+        hit = entry is not None and entry[0] == version
+        CACHE_LOOKUPS.inc(result='hit' if hit else 'miss')
+        if not hit:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response  # errors are not cached
+            body = response.get_data()
+            etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+            if len(body) >= COMPRESS_MIN_SIZE:
+                encoded = _encodings(body, API_GZIP_LEVEL, API_BROTLI_QUALITY)
+            else:
+                encoded = {'identity': body}
+            if len(_response_cache) >= RESPONSE_CACHE_SIZE:
+                _response_cache.clear()
+            entry = _response_cache[key] = (version, etag, encoded)
+        
+        _, etag, encoded = entry
+        response = _encoded_response('application/json', etag, encoded)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    # Streamed responses (export, SSE) are timed up to the first byte only
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, route=route)
+    REQUESTS.inc(route=route, status=response.status_code)
+    return response
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/')
 def index():
-    return render_template_string(DASHBOARD_HTML)
+    response = _encoded_response(*load_assets()['index.html'])
+    # Small, and revalidated on every load so a restart picks up new assets
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/assets/<name>')
+def serve_asset(name):
+    asset = load_assets().get(name)
+    if asset is None or name == 'index.html':
+        abort(404)
+    response = _encoded_response(*asset)
+    response.headers['Cache-Control'] = ASSET_CACHE_CONTROL
+    return response
 
 
 @app.route('/api/today')
+@cached_api
 def api_today():
     stats = get_today_stats()
     time_segments = get_today_sessions_by_time_segment()
@@ -639,17 +234,100 @@ def api_today():
     return jsonify({
         'total_pomodoros': stats['total_pomodoros'],
         'total_hours': stats['total_hours'],
-        'time_segments': time_segments
+        'time_segments': time_segments,
+        # Sessions carry segment_id only; names and colors are sent once here
+        'segments': get_segment_map()
+    })
+
+
+# Pages past this are refused; keeps every offset (and any integer passed to
+# SQLite) well inside a 64-bit integer
+MAX_PAGE = 10 ** 9
+SQLITE_MAX_INTEGER = 2 ** 63 - 1
+
+
+def _day_range_args():
+    # ?date=D for one day, or ?start=A&end=B for a range; defaults to today.
+    # None when the dates are malformed or out of order.
+    today = datetime.now().strftime("%Y-%m-%d")
+    start_date = request.args.get('date') or request.args.get('start') or today
+    end_date = request.args.get('date') or request.args.get('end') or start_date
+    try:
+        if datetime.strptime(start_date, "%Y-%m-%d") > datetime.strptime(end_date, "%Y-%m-%d"):
+            return None
+    except ValueError:
+        return None
+    return start_date, end_date
+
+
+@app.route('/api/day')
+@cached_api
+def api_day():
+    date_range = _day_range_args()
+    if date_range is None:
+        return jsonify({"error": "date (or start and end) must be YYYY-MM-DD, start first"}), 400
+    view = get_sessions_by_time_bucket(*date_range)
+    return jsonify({**view, "segments": get_segment_map()})
+
+
+@app.route('/api/day/sessions')
+@cached_api
+def api_day_sessions():
+    date_range = _day_range_args()
+    bucket = request.args.get('bucket', '')
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+    except ValueError:
+        page = None
+    if page is not None and page > MAX_PAGE:
+        page = None
+    if date_range is None or page is None or bucket not in {b["key"] for b in get_time_buckets()}:
+        return jsonify({"error": "need a valid date (or start and end), bucket and page"}), 400
+    
+    # One extra row tells whether another page follows
+    sessions = get_time_bucket_sessions(
+        *date_range, bucket, limit=DAY_PAGE_SIZE + 1, offset=(page - 1) * DAY_PAGE_SIZE
+    )
+    return jsonify({
+        "bucket": bucket,
+        "page": page,
+        "sessions": sessions[:DAY_PAGE_SIZE],
+        "has_more": len(sessions) > DAY_PAGE_SIZE,
+        "segments": get_segment_map(),
     })
 
 
+def _period_json(stats: dict):
+    # ?shape=columnar turns the per-segment and per-day objects into parallel
+    # arrays, which keeps long ranges compact
+    shape = request.args.get('shape', 'objects')
+    if shape == 'columnar':
+        days = sorted(stats["daily"])
+        stats = {
+            **stats,
+            "segments": {
+                field: [segment[field] for segment in stats["segments"]]
+                for field in ("id", "name", "color", "minutes", "count")
+            },
+            "daily": {
+                "days": days,
+                "count": [stats["daily"][day]["count"] for day in days],
+                "minutes": [stats["daily"][day]["minutes"] for day in days],
+            },
+        }
+    elif shape != 'objects':
+        return jsonify({"error": "shape must be objects or columnar"}), 400
+    return jsonify(stats)
+
+
 @app.route('/api/week')
+@cached_api
 def api_week():
-    stats = get_weekly_stats()
-    return jsonify(stats)
+    return _period_json(get_weekly_stats())
 
 
 @app.route('/api/month')
+@cached_api
 def api_month():
     today = datetime.now()
     month_start = today.replace(day=1)
@@ -662,48 +340,290 @@ def api_month():
     start_date = month_start.strftime("%Y-%m-%d")
     end_date = month_end.strftime("%Y-%m-%d")
     
-    sessions = get_sessions_by_date_range(start_date, end_date)
+    return _period_json({
+        "month_name": today.strftime("%B %Y"),
+        "month_start": start_date,
+        "month_end": end_date,
+        **get_period_stats(start_date, end_date)
+    })
+
+
+@app.route('/api/search')
+@cached_api
+def api_search():
+    query = request.args.get('q', '')
+    start_date = request.args.get('start') or None
+    end_date = request.args.get('end') or None
     
-    total_minutes = sum(s["duration_minutes"] for s in sessions)
+    try:
+        for day in (start_date, end_date):
+            if day:
+                datetime.strptime(day, "%Y-%m-%d")
+        segment_id = int(request.args['segment']) if request.args.get('segment') else None
+        page = int(request.args.get('page', 1))
+        per_page = int(request.args.get('per_page', SEARCH_PAGE_SIZE))
+        if page > MAX_PAGE or (segment_id is not None and abs(segment_id) > SQLITE_MAX_INTEGER):
+            raise ValueError("out of range")
+    except ValueError:
+        return jsonify({"error": "start/end must be YYYY-MM-DD; segment, page and per_page integers"}), 400
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), 100)
     
-    segment_stats = {}
-    for session in sessions:
-        seg_name = session["segment_name"]
-        if seg_name not in segment_stats:
-            segment_stats[seg_name] = {
-                "name": seg_name,
-                "color": session["segment_color"],
-                "minutes": 0,
-                "count": 0
-            }
-        segment_stats[seg_name]["minutes"] += session["duration_minutes"]
-        segment_stats[seg_name]["count"] += 1
+    results = search_sessions(
+        query, segment_id, start_date, end_date,
+        limit=per_page, offset=(page - 1) * per_page
+    )
+    return jsonify({**results, "page": page, "segments": get_segment_map()})
+
+
+# Longest range the analytics endpoints cover, ending at the requested end
+MAX_ANALYTICS_DAYS = 20 * 366
+
+
+def _analytics_range():
+    # start defaults to the first recorded session and end to today; returns
+    # None when either is not a YYYY-MM-DD date or they are out of order.
+    # The range is then narrowed to days that can hold sessions: from the
+    # first one (and at most MAX_ANALYTICS_DAYS) up to today
+    from session_store import get_session_store
+    
+    today = datetime.now().date()
+    first_day = get_session_store().first_day()
+    try:
+        start = datetime.strptime(request.args.get('start') or first_day or str(today), "%Y-%m-%d").date()
+        end = datetime.strptime(request.args.get('end') or str(today), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+    if start > end:
+        return None
+    
+    end = min(end, today)
+    first = datetime.strptime(first_day, "%Y-%m-%d").date() if first_day else end
+    start = max(start, first, end - timedelta(days=MAX_ANALYTICS_DAYS - 1))
+    return str(min(start, end)), str(end)
+
+
+def _bad_range():
+    return jsonify({"error": "start and end must be YYYY-MM-DD dates, start first"}), 400
+
+
+@app.route('/api/analytics/streaks')
+@cached_api
+def api_streaks():
+    import analytics
+    
+    date_range = _analytics_range()
+    if date_range is None:
+        return _bad_range()
+    return jsonify(analytics.streaks(*date_range))
+
+
+@app.route('/api/analytics/rolling')
+@cached_api
+def api_rolling():
+    import analytics
+    
+    date_range = _analytics_range()
+    if date_range is None:
+        return _bad_range()
+    return jsonify(analytics.rolling_averages(*date_range))
+
+
+@app.route('/api/analytics/trends')
+@cached_api
+def api_trends():
+    import analytics
     
-    daily_stats = {}
+    date_range = _analytics_range()
+    if date_range is None:
+        return _bad_range()
+    period = request.args.get('period', 'week')
+    if period not in ('week', 'month'):
+        return jsonify({"error": "period must be week or month"}), 400
+    return jsonify(analytics.segment_trends(*date_range, period=period))
+
+
+@app.route('/api/analytics/heatmap')
+@cached_api
+def api_heatmap():
+    import analytics
+    
+    date_range = _analytics_range()
+    if date_range is None:
+        return _bad_range()
+    return jsonify(analytics.hour_weekday_heatmap(*date_range))
+
+
+# Seconds between keep-alive comments on an idle event stream
+STREAM_KEEPALIVE = 15
+
+# Each open stream holds a request thread for as long as the tab stays open.
+# Past this many per process the stream is refused with a 503 and the page
+# falls back to polling; run_dashboard sets it to half of --threads
+MAX_STREAMS = 4
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+metrics.Gauge(
+    "pomodoro_open_streams", "Live-update streams currently open in this process",
+    lambda: _open_streams
+)
+
+
+def _close_stream():
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+
+@app.route('/api/stream')
+def api_stream():
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= MAX_STREAMS:
+            return Response("Too many live-update streams", status=503, mimetype='text/plain')
+        _open_streams += 1
+    
+    def events():
+        version = get_data_version()
+        yield "retry: 5000\n\n"
+        while True:
+            current = wait_for_data_change(version, STREAM_KEEPALIVE)
+            if current != version:
+                version = current
+                yield f"event: change\ndata: {version}\n\n"
+            else:
+                yield ": keepalive\n\n"
+    
+    response = Response(
+        events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Runs when the server closes the response, even if it was never iterated
+    response.call_on_close(_close_stream)
+    return response
+
+
+EXPORT_COLUMNS = [
+    "id", "segment", "description", "duration_minutes",
+    "focus_rating", "started_at", "completed_at"
+]
+
+
+def _export_csv(sessions):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for i, session in enumerate(sessions, 1):
+        writer.writerow(session)
+        if i % 500 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _export_ndjson(sessions):
     for session in sessions:
-        day = session["completed_at"][:10]
-        if day not in daily_stats:
-            daily_stats[day] = {"minutes": 0, "count": 0}
-        daily_stats[day]["minutes"] += session["duration_minutes"]
-        daily_stats[day]["count"] += 1
+        yield json.dumps(session) + "\n"
+
+
+def _gzip_stream(chunks):
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(API_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if data := compressor.compress(chunk.encode('utf-8')):
+            yield data
+    yield compressor.flush()
+
+
+@app.route('/api/export')
+def api_export():
+    start_date = request.args.get('start', '1970-01-01')
+    end_date = request.args.get('end', datetime.now().strftime("%Y-%m-%d"))
+    fmt = request.args.get('format', 'csv')
     
-    best_day_count = max([d["count"] for d in daily_stats.values()]) if daily_stats else 0
+    try:
+        datetime.strptime(start_date, "%Y-%m-%d")
+        datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD dates"}), 400
     
-    return jsonify({
-        "month_name": today.strftime("%B %Y"),
-        "month_start": start_date,
-        "month_end": end_date,
-        "total_minutes": total_minutes,
-        "total_hours": round(total_minutes / 60, 1),
-        "total_pomodoros": len(sessions),
-        "segments": list(segment_stats.values()),
-        "daily": daily_stats,
-        "best_day_count": best_day_count
-    })
+    if fmt == 'csv':
+        body, mimetype = _export_csv(iter_sessions(start_date, end_date)), 'text/csv'
+    elif fmt == 'ndjson':
+        body, mimetype = _export_ndjson(iter_sessions(start_date, end_date)), 'application/x-ndjson'
+    else:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    
+    filename = f"pomodoro-sessions-{start_date}-to-{end_date}.{fmt}"
+    gzipped = request.accept_encodings.best_match(['gzip']) == 'gzip'
+    response = Response(
+        _gzip_stream(body) if gzipped else body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+    if gzipped:
+        response.content_encoding = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 
+def _serve_waitress(port: int, threads: int, keep_alive: int):
+    from waitress import create_server
+    
+    server = create_server(
+        app, host='0.0.0.0', port=port,
+        threads=threads, channel_timeout=keep_alive, ident='pomodoro-dashboard'
+    )
+    if threading.current_thread() is threading.main_thread():
+        # waitress stops accepting and drains its worker threads on SystemExit
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.run()
+    finally:
+        server.close()
 
-def run_dashboard(port: int = 5050):
-    app.run(host='0.0.0.0', port=port, debug=False)
+
+def _serve_gunicorn(port: int, workers: int, threads: int, keep_alive: int):
+    from gunicorn.app.base import BaseApplication
+    
+    class DashboardApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'0.0.0.0:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('keepalive', keep_alive)
+            self.cfg.set('graceful_timeout', 10)
+            # /api/stream responses stay open far longer than a normal request
+            self.cfg.set('timeout', 0)
+        
+        def load(self):
+            return app
+    
+    DashboardApplication().run()
+
+
+def run_dashboard(
+    port: int = 5050,
+    server: str = 'dev',
+    workers: int = 1,
+    threads: int = 8,
+    keep_alive: int = 60
+):
+    global MAX_STREAMS
+    load_assets()
+    if server in ('waitress', 'gunicorn'):
+        # Keep at least half of the fixed thread pool for everything else
+        MAX_STREAMS = threads // 2
+    if server == 'waitress':
+        _serve_waitress(port, threads, keep_alive)
+    elif server == 'gunicorn':
+        _serve_gunicorn(port, workers, threads, keep_alive)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,295 @@
+import atexit
+import html
+import json
+import logging
+import os
+import queue
+import re
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from itertools import islice
 from pathlib import Path
+from typing import Iterable, Iterator
+
+import metrics
+
+logger = logging.getLogger(__name__)
 
 DB_PATH = Path.home() / ".pomodoro_tracker" / "pomodoro.db"
+CONFIG_PATH = Path.home() / ".pomodoro_tracker" / "config.json"
+
+# Time-of-day buckets for the day view, in display order. Each runs from its
+# start until the next bucket's start, wrapping past midnight. Override with a
+# "time_buckets" list of the same shape in CONFIG_PATH; start is "HH:MM" or an hour.
+DEFAULT_TIME_BUCKETS = [
+    {"key": "morning", "label": "Morning (6 AM - 12 PM)", "start": "06:00"},
+    {"key": "afternoon", "label": "Afternoon (12 PM - 6 PM)", "start": "12:00"},
+    {"key": "evening", "label": "Evening (6 PM - 12 AM)", "start": "18:00"},
+    {"key": "midnight", "label": "Midnight (12 AM - 6 AM)", "start": "00:00"},
+]
+_time_buckets = (None, None)  # (config file mtime, parsed buckets)
+
+_LOCAL_EPOCH = datetime(1970, 1, 1)
+
+# Sessions per bucket per page in the day view
+DAY_PAGE_SIZE = 20
+
+# Rows per executemany() call in save_sessions_bulk
+BULK_BATCH_SIZE = 5000
+
+# Rows fetched per round trip when streaming sessions out
+EXPORT_BATCH_SIZE = 1000
+
+# Results per page from search_sessions, and the match count above which
+# results come newest first instead of by relevance: scoring every match of
+# a word nearly all sessions share costs time and tells little
+SEARCH_PAGE_SIZE = 20
+SEARCH_RANK_LIMIT = 5000
+
+# Write-behind queue: pending saves before submit() blocks, saves per commit,
+# and attempts per batch while another connection holds the write lock
+WRITE_QUEUE_SIZE = 1000
+WRITE_BATCH_SIZE = 100
+WRITE_RETRIES = 5
+
+# Idle connections kept open for reuse; the Flask request threads and the Tk
+# timer thread all draw from the same pool.
+POOL_SIZE = 8
+
+_pool: list[sqlite3.Connection] = []
+_pool_lock = threading.Lock()
+_pool_key = None  # (pid, db path) the pooled connections belong to
+
+# Schema setup (see MIGRATIONS): sessions handled per backfill transaction,
+# and the pause between them that lets the widget's writes through
+BACKFILL_CHUNK_SIZE = 2000
+BACKFILL_PAUSE = 0.05
+
+# Run pending backfills on a background thread once the schema is current;
+# `main.py migrate` turns this off and runs them in the foreground instead
+BACKGROUND_BACKFILLS = True
+
+_schema_key = None  # (pid, db path) whose schema this process has checked
+_schema_lock = threading.Lock()
+_backfill_thread = None
+
+# Segment registry: id -> {"id", "name", "color"}, reloaded whenever the
+# segments counter in the database has moved since it was read
+_segment_cache = {}
+_segment_cache_key = None  # (pid, db path, counter value) it was loaded at
+_segment_lock = threading.Lock()
+
+# Bumped whenever this process writes, or sees the counters in the database
+# move (a commit from another process); readers use it to tell whether cached
+# results are stale
+_data_generation = 0
+_data_count_key = None  # (pid, db path, counters total) last seen
+_generation_changed = threading.Condition()
+
+# How often wait_for_data_change checks for commits from other processes
+DATA_POLL_INTERVAL = 2.0
+
+# Log database calls slower than this many milliseconds (0 disables)
+SLOW_QUERY_MS = float(os.environ.get("POMODORO_SLOW_QUERY_MS", "0"))
+
+QUERY_SECONDS = metrics.Histogram(
+    "pomodoro_db_query_seconds", "Time spent in each database.py function"
+)
+QUERY_ROWS = metrics.Counter(
+    "pomodoro_db_rows_fetched_total", "Rows fetched from SQLite by each database.py function"
+)
+CONNECTIONS_OPENED = metrics.Counter(
+    "pomodoro_db_connections_opened_total", "SQLite connections opened"
+)
+metrics.Gauge(
+    "pomodoro_db_pool_idle_connections", "Idle connections in the pool", lambda: len(_pool)
+)
 
+# Rows fetched on this thread since the innermost instrumented call began
+_fetch_stats = threading.local()
 
-def get_connection() -> sqlite3.Connection:
+
+def _count_rows(count: int):
+    _fetch_stats.rows = getattr(_fetch_stats, "rows", 0) + count
+
+
+class _CountingCursor(sqlite3.Cursor):
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            _count_rows(1)
+        return row
+    
+    def fetchmany(self, size: int = None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        _count_rows(len(rows))
+        return rows
+    
+    def fetchall(self):
+        rows = super().fetchall()
+        _count_rows(len(rows))
+        return rows
+    
+    def __next__(self):
+        row = super().__next__()
+        _count_rows(1)
+        return row
+
+
+class _PooledConnection(sqlite3.Connection):
+    def cursor(self, factory=_CountingCursor):
+        return super().cursor(factory)
+
+
+def instrumented(fn):
+    # Records latency and fetched rows per function; nested calls roll their
+    # rows up into the caller's count
+    name = fn.__name__
+    
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        outer_rows = getattr(_fetch_stats, "rows", 0)
+        _fetch_stats.rows = 0
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            rows = _fetch_stats.rows
+            _fetch_stats.rows = outer_rows + rows
+            QUERY_SECONDS.observe(elapsed, query=name)
+            QUERY_ROWS.inc(rows, query=name)
+            if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+                logger.warning("Slow query: %s took %.1f ms (%d rows)", name, elapsed * 1000, rows)
+    
+    return wrapper
+
+
+def _open_connection() -> sqlite3.Connection:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    # Pooled connections move between threads, but only ever one holder at a time
+    conn = sqlite3.connect(
+        str(DB_PATH), timeout=10, check_same_thread=False, factory=_PooledConnection
+    )
+    CONNECTIONS_OPENED.inc()
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -16000")     # ~16 MB page cache
+    conn.execute("PRAGMA mmap_size = 268435456")   # 256 MB
+    conn.execute("PRAGMA temp_store = MEMORY")
     return conn
 
 
-def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    
+def _acquire(key: tuple) -> sqlite3.Connection:
+    global _pool_key
+    with _pool_lock:
+        if _pool_key != key:
+            # DB_PATH changed, or we are a forked child holding the parent's
+            # handles (which must never be used or closed here)
+            if _pool_key is not None and _pool_key[0] == key[0]:
+                for conn in _pool:
+                    conn.close()
+            _pool.clear()
+            _pool_key = key
+        if _pool:
+            return _pool.pop()
+    return _open_connection()
+
+
+def _release(conn: sqlite3.Connection, key: tuple):
+    if conn.in_transaction:
+        conn.rollback()
+    with _pool_lock:
+        if _pool_key == key and len(_pool) < POOL_SIZE:
+            _pool.append(conn)
+            return
+    conn.close()
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    key = (os.getpid(), str(DB_PATH))
+    conn = _acquire(key)
+    try:
+        if _schema_key != key:
+            _ensure_schema(conn, key)
+        yield conn
+    finally:
+        _release(conn, key)
+
+
+def close_connections():
+    global _pool_key
+    with _pool_lock:
+        if _pool_key is not None and _pool_key[0] == os.getpid():
+            for conn in _pool:
+                conn.close()
+        _pool.clear()
+        _pool_key = None
+
+
+atexit.register(close_connections)
+
+
+def _data_count() -> tuple:
+    # Triggers move the counters on every change to sessions, rollups and
+    # segments, whichever connection or process makes it
+    key = (os.getpid(), str(DB_PATH))
+    with get_connection() as conn:
+        total = conn.execute("SELECT COALESCE(SUM(value), 0) FROM counters").fetchone()[0]
+    return key + (total,)
+
+
+def _bump_data_generation():
+    # After this process commits: wake waiters now rather than at their next
+    # poll, and take the new counters as seen so the write counts only once
+    global _data_generation, _data_count_key
+    count_key = _data_count()
+    with _generation_changed:
+        _data_count_key = count_key
+        _data_generation += 1
+        _generation_changed.notify_all()
+
+
+@instrumented
+def get_data_version() -> int:
+    global _data_generation, _data_count_key
+    # Day views depend on the time-of-day buckets too; re-reading an edited
+    # config file bumps the generation
+    get_time_buckets()
+    count_key = _data_count()
+    with _generation_changed:
+        if count_key != _data_count_key:
+            if _data_count_key is not None:
+                _data_generation += 1
+                _generation_changed.notify_all()
+            _data_count_key = count_key
+        return _data_generation
+
+
+def wait_for_data_change(version: int, timeout: float) -> int:
+    # Writes from this process wake waiters immediately; commits from other
+    # processes are noticed by re-reading the counters every DATA_POLL_INTERVAL
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        with _generation_changed:
+            _generation_changed.wait_for(
+                lambda: _data_generation != version,
+                timeout=max(0, min(DATA_POLL_INTERVAL, remaining))
+            )
+        current = get_data_version()
+        if current != version or remaining <= DATA_POLL_INTERVAL:
+            return current
+
+
+def _migration_1(cursor: sqlite3.Cursor) -> bool:
     # Segments table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS segments (
@@ -40,6 +314,33 @@ def init_db():
         )
     """)
     
+    # Range scans for the dashboard: the completed_at index also carries the
+    # columns the aggregates read, so those queries never touch the table
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sessions_completed_covering
+        ON sessions (completed_at, segment_id, duration_minutes, focus_rating)
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sessions_started_at ON sessions (started_at)"
+    )
+    
+    # Per day x segment rollups backing the week/month views, kept current by
+    # save_session; history is backfilled the first time the table appears
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_segment_stats'"
+    )
+    rollups_exist = cursor.fetchone() is not None
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_segment_stats (
+            day TEXT NOT NULL,
+            segment_id INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            minutes INTEGER NOT NULL DEFAULT 0,
+            focus_sum INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, segment_id)
+        ) WITHOUT ROWID
+    """)
+    
     # Insert 5 fixed segments
     default_segments = [
         ("Work", "#e74c3c"),      # 🔴 Red - Office/Job work
@@ -54,33 +355,434 @@ def init_db():
             "INSERT OR IGNORE INTO segments (name, color) VALUES (?, ?)",
             (name, color)
         )
+    return not rollups_exist
+
+
+def _backfill_rollups(cursor: sqlite3.Cursor, after_id: int, up_to_id: int):
+    _rollup_sessions(cursor, "id > ? AND id <= ?", (after_id, up_to_id))
+
+
+def _migration_2(cursor: sqlite3.Cursor) -> bool:
+    # Moved by triggers on every change to segments, whichever process or tool
+    # makes it, so each process can tell when its cached registry is stale
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('segments', 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS segments_changed_{event.lower()}
+            AFTER {event} ON segments
+            BEGIN
+                UPDATE counters SET value = value + 1 WHERE name = 'segments';
+            END
+        """)
+    return False
+
+
+def _migration_3(cursor: sqlite3.Cursor) -> bool:
+    # Full-text index over descriptions. External content: the text stays in
+    # sessions and the index refers to rows by id, kept in step by triggers.
+    # Until the backfill finishes, older rows must not be updated or deleted
+    # (the app never does either).
+    cursor.execute("PRAGMA compile_options")
+    if "ENABLE_FTS5" not in {row[0] for row in cursor.fetchall()}:
+        logger.warning("SQLite was built without FTS5; search falls back to scanning descriptions")
+        return False
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS sessions_fts USING fts5(
+            description,
+            content = 'sessions',
+            content_rowid = 'id',
+            tokenize = 'porter unicode61'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS sessions_fts_insert AFTER INSERT ON sessions
+        BEGIN
+            INSERT INTO sessions_fts (rowid, description) VALUES (new.id, new.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS sessions_fts_delete AFTER DELETE ON sessions
+        BEGIN
+            INSERT INTO sessions_fts (sessions_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS sessions_fts_update AFTER UPDATE OF description ON sessions
+        BEGIN
+            INSERT INTO sessions_fts (sessions_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+            INSERT INTO sessions_fts (rowid, description) VALUES (new.id, new.description);
+        END
+    """)
+    return True
+
+
+def _backfill_search_index(cursor: sqlite3.Cursor, after_id: int, up_to_id: int):
+    cursor.execute(
+        """
+        INSERT INTO sessions_fts (rowid, description)
+        SELECT id, description FROM sessions WHERE id > ? AND id <= ?
+        """,
+        (after_id, up_to_id)
+    )
+
+
+def _migration_4(cursor: sqlite3.Cursor) -> bool:
+    # Integer timestamps: started_ts and completed_ts are epoch seconds and
+    # utc_offset the local offset (seconds east of UTC) when the session
+    # started, so its local day is (started_ts + utc_offset) // 86400
+    cursor.execute("ALTER TABLE sessions ADD COLUMN started_ts INTEGER")
+    cursor.execute("ALTER TABLE sessions ADD COLUMN completed_ts INTEGER")
+    cursor.execute("ALTER TABLE sessions ADD COLUMN utc_offset INTEGER")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_started_ts ON sessions (started_ts)")
+    # Ranges no longer scan completed_at text
+    cursor.execute("DROP INDEX IF EXISTS idx_sessions_completed_covering")
     
-    conn.commit()
-    conn.close()
+    # Rollups move from UTC completion days to local start days: start them
+    # over, and the backfill adds sessions back as it converts them
+    cursor.execute("DELETE FROM daily_segment_stats")
+    cursor.execute("UPDATE schema_backfills SET last_id = end_id WHERE version = 1")
+    return True
 
 
-def get_segments() -> list[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, name, color FROM segments ORDER BY id")
-    segments = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return segments
+def _backfill_timestamps(cursor: sqlite3.Cursor, after_id: int, up_to_id: int):
+    # started_at is local wall-clock text, completed_at UTC text
+    cursor.execute(
+        """
+        UPDATE sessions SET
+            started_ts = CAST(strftime('%s', started_at, 'utc') AS INTEGER),
+            completed_ts = CAST(strftime('%s', completed_at) AS INTEGER),
+            utc_offset = CAST(strftime('%s', started_at) AS INTEGER)
+                         - CAST(strftime('%s', started_at, 'utc') AS INTEGER)
+        WHERE id > ? AND id <= ?
+        """,
+        (after_id, up_to_id)
+    )
+    _rollup_sessions(cursor, "id > ? AND id <= ?", (after_id, up_to_id))
 
 
-def add_segment(name: str, color: str = "#3498db") -> int:
-    conn = get_connection()
+def _migration_5(cursor: sqlite3.Cursor) -> bool:
+    # Moved by every change to sessions or rollups from any process or tool;
+    # together with the segments counter it is the data version
+    cursor.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('data', 0)")
+    for table in ("sessions", "daily_segment_stats"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_changed_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE counters SET value = value + 1 WHERE name = 'data';
+                END
+            """)
+    return False
+
+
+def _migration_6(cursor: sqlite3.Cursor) -> bool:
+    # Ranges select sessions by local start time, the same clock their rollup
+    # day comes from. Queries must spell the expression exactly like this
+    # (started_ts + utc_offset) for SQLite to use the index.
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sessions_local_start ON sessions (started_ts + utc_offset)"
+    )
+    cursor.execute("DROP INDEX IF EXISTS idx_sessions_started_ts")
+    return False
+
+
+class Migration:
+    """
+    One step of the schema, applied in its own transaction.
+    
+    apply(cursor) makes the schema change and returns whether existing
+    sessions need a backfill; backfill(cursor, after_id, up_to_id) then fills
+    in sessions with ids in (after_id, up_to_id], one short transaction per
+    chunk, with progress kept in schema_backfills so it resumes after a restart.
+    Sessions saved after the migration must be handled by the write path.
+    """
+    
+    def __init__(self, version: int, description: str, apply, backfill=None):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.backfill = backfill
+
+
+# Applied in order; a database's PRAGMA user_version is the last one it has.
+# Never edit a released migration, append a new one.
+MIGRATIONS = [
+    Migration(1, "Segments, sessions, indexes and daily rollups", _migration_1, _backfill_rollups),
+    Migration(2, "Segment change counter for the in-process segment cache", _migration_2),
+    Migration(3, "Full-text search index over session descriptions", _migration_3, _backfill_search_index),
+    Migration(4, "Integer epoch timestamps; rollups by local start day", _migration_4, _backfill_timestamps),
+    Migration(5, "Data change counter for cached results and live updates", _migration_5),
+    Migration(6, "Index sessions by local start time", _migration_6),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def _user_version(cursor: sqlite3.Cursor) -> int:
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+
+def _has_table(cursor: sqlite3.Cursor, name: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return cursor.fetchone() is not None
+
+
+def _pending_backfills(cursor: sqlite3.Cursor) -> list[tuple]:
+    # (version, last_id, end_id) for backfills that still have rows to cover
+    if not _has_table(cursor, "schema_backfills"):
+        return []
+    cursor.execute(
+        "SELECT version, last_id, end_id FROM schema_backfills WHERE last_id < end_id ORDER BY version"
+    )
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def _apply_migrations(conn: sqlite3.Connection):
     cursor = conn.cursor()
+    if _user_version(cursor) >= SCHEMA_VERSION:
+        return
+    for migration in MIGRATIONS:
+        # One transaction per migration; BEGIN IMMEDIATE serialises this with
+        # other processes opening the same file, hence the re-check inside
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            if _user_version(cursor) < migration.version:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_backfills (
+                        version INTEGER PRIMARY KEY,
+                        last_id INTEGER NOT NULL,
+                        end_id INTEGER NOT NULL
+                    )
+                """)
+                needs_backfill = migration.apply(cursor)
+                if migration.backfill and needs_backfill:
+                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM sessions")
+                    end_id = cursor.fetchone()[0]
+                    if end_id:
+                        cursor.execute(
+                            "INSERT OR REPLACE INTO schema_backfills (version, last_id, end_id) VALUES (?, 0, ?)",
+                            (migration.version, end_id)
+                        )
+                cursor.execute(f"PRAGMA user_version = {migration.version}")
+                logger.info("Applied schema migration %d: %s", migration.version, migration.description)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def _ensure_schema(conn: sqlite3.Connection, key: tuple):
+    global _schema_key, _backfill_thread
+    with _schema_lock:
+        if _schema_key == key:
+            return
+        _apply_migrations(conn)
+        _schema_key = key
+        if BACKGROUND_BACKFILLS and _pending_backfills(conn.cursor()):
+            if _backfill_thread is None or not _backfill_thread.is_alive():
+                _backfill_thread = threading.Thread(
+                    target=_run_backfills_logged, name="schema-backfill", daemon=True
+                )
+                _backfill_thread.start()
+
+
+def init_db():
+    # The schema is set up lazily by the first get_connection() in each
+    # process; calling this just does it eagerly
+    with get_connection():
+        pass
+
+
+def run_backfills(chunk_size: int = BACKFILL_CHUNK_SIZE, progress=None) -> int:
+    """
+    Work through pending migration backfills until none are left.
+    
+    Each chunk claims its id range and records progress in the same
+    transaction, so several processes can run this at once without
+    covering a row twice. progress(version, done_id, end_id) is called
+    after each chunk. Returns the number of chunks run.
+    """
+    backfills = {m.version: m.backfill for m in MIGRATIONS if m.backfill}
+    chunks = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        while True:
+            cursor.execute("BEGIN IMMEDIATE")
+            pending = _pending_backfills(cursor)
+            if not pending:
+                conn.commit()
+                return chunks
+            version, last_id, end_id = pending[0]
+            up_to_id = min(last_id + chunk_size, end_id)
+            backfills[version](cursor, last_id, up_to_id)
+            cursor.execute(
+                "UPDATE schema_backfills SET last_id = ? WHERE version = ?", (up_to_id, version)
+            )
+            conn.commit()
+            chunks += 1
+            _bump_data_generation()
+            if progress:
+                progress(version, up_to_id, end_id)
+            if up_to_id == end_id:
+                logger.info("Finished backfill for schema migration %d", version)
+            time.sleep(BACKFILL_PAUSE)
+
+
+def _run_backfills_logged():
+    try:
+        run_backfills()
+    except Exception:
+        # Progress is committed per chunk; the next process start resumes
+        logger.exception("Schema backfill failed")
+
+
+def migration_plan() -> dict:
+    """
+    Describe what migrating the database would do, without changing it.
+    
+    Reads through a private read-only connection with no PRAGMAs set, so
+    neither the schema setup nor the journal mode is touched, and a missing
+    database is reported (exists is False) rather than created.
+    """
+    current, backfills, max_id = 0, [], 0
+    exists = DB_PATH.exists()
+    if exists:
+        conn = sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            cursor = conn.cursor()
+            current = _user_version(cursor)
+            backfills = [
+                {"version": version, "done_id": last_id, "end_id": end_id}
+                for version, last_id, end_id in _pending_backfills(cursor)
+            ]
+            if _has_table(cursor, "sessions"):
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM sessions")
+                max_id = cursor.fetchone()[0]
+        finally:
+            conn.close()
+    
+    descriptions = {m.version: m.description for m in MIGRATIONS}
+    for backfill in backfills:
+        backfill["description"] = descriptions.get(backfill["version"], "")
+    
+    migrations = [
+        {
+            "version": m.version,
+            "description": m.description,
+            # Whether apply() asks for one depends on what it finds; at most
+            # the sessions up to max_session_id are backfilled
+            "may_backfill": m.backfill is not None,
+        }
+        for m in MIGRATIONS if m.version > current
+    ]
+    
+    return {
+        "database": str(DB_PATH),
+        "exists": exists,
+        "max_session_id": max_id,
+        "current_version": current,
+        "target_version": SCHEMA_VERSION,
+        "migrations": migrations,
+        "backfills": backfills,
+    }
+
+
+def _rollup_sessions(cursor: sqlite3.Cursor, where: str = "1", params: tuple = ()):
+    # Fold the matching sessions into daily_segment_stats under the local day
+    # they started; callers run this in the same transaction as the session
+    # insert. Rows the timestamp backfill has not reached yet are left to it.
     cursor.execute(
-        "INSERT INTO segments (name, color) VALUES (?, ?)",
-        (name, color)
+        f"""
+        INSERT INTO daily_segment_stats (day, segment_id, count, minutes, focus_sum)
+        SELECT date(started_ts + utc_offset, 'unixepoch'), segment_id, COUNT(*),
+               COALESCE(SUM(duration_minutes), 0), COALESCE(SUM(focus_rating), 0)
+        FROM sessions
+        WHERE ({where}) AND started_ts IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (day, segment_id) DO UPDATE SET
+            count = count + excluded.count,
+            minutes = minutes + excluded.minutes,
+            focus_sum = focus_sum + excluded.focus_sum
+        """,
+        params
     )
-    segment_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+
+
+@instrumented
+def rebuild_daily_stats() -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM daily_segment_stats")
+        _rollup_sessions(cursor)
+        # Every session is counted now; an unfinished rollup backfill would add some twice
+        if _has_table(cursor, "schema_backfills"):
+            cursor.execute("UPDATE schema_backfills SET last_id = end_id WHERE version = 1")
+        cursor.execute("SELECT COUNT(*) FROM daily_segment_stats")
+        rows = cursor.fetchone()[0]
+        conn.commit()
+        _bump_data_generation()
+    return rows
+
+
+def _segment_map(cursor: sqlite3.Cursor) -> dict[int, dict]:
+    # One primary-key lookup instead of joining segments into every session
+    # query; the returned dict is shared, callers must not modify it
+    global _segment_cache, _segment_cache_key
+    cursor.execute("SELECT value FROM counters WHERE name = 'segments'")
+    key = (os.getpid(), str(DB_PATH), cursor.fetchone()[0])
+    with _segment_lock:
+        if _segment_cache_key != key:
+            cursor.execute("SELECT id, name, color FROM segments ORDER BY id")
+            _segment_cache = {row["id"]: dict(row) for row in cursor.fetchall()}
+            _segment_cache_key = key
+        return _segment_cache
+
+
+@instrumented
+def get_segment_map() -> dict[int, dict]:
+    with get_connection() as conn:
+        segments = _segment_map(conn.cursor())
+    return {segment_id: dict(segment) for segment_id, segment in segments.items()}
+
+
+@instrumented
+def get_segments() -> list[dict]:
+    return list(get_segment_map().values())
+
+
+@instrumented
+def add_segment(name: str, color: str = "#3498db") -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO segments (name, color) VALUES (?, ?)",
+            (name, color)
+        )
+        segment_id = cursor.lastrowid
+        conn.commit()
+        _bump_data_generation()
+    invalidate_segment_cache()
     return segment_id
 
 
+def invalidate_segment_cache():
+    # Other processes notice through the segments counter instead
+    global _segment_cache_key
+    with _segment_lock:
+        _segment_cache_key = None
+
+
+@instrumented
 def save_session(
     segment_id: int,
     description: str,
@@ -88,112 +790,701 @@ def save_session(
     started_at: datetime,
     focus_rating: int = 3
 ) -> int:
-    conn = get_connection()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        session_id = _insert_session(
+            cursor, segment_id, description, duration_minutes, started_at, focus_rating
+        )
+        conn.commit()
+        _bump_data_generation()
+    return session_id
+
+
+def _insert_session(
+    cursor: sqlite3.Cursor,
+    segment_id: int,
+    description: str,
+    duration_minutes: int,
+    started_at: datetime,
+    focus_rating: int = 3
+) -> int:
+    started_ts, utc_offset = _local_timestamp(started_at)
+    completed_at = datetime.now(timezone.utc)
     cursor.execute(
         """
-        INSERT INTO sessions (segment_id, description, duration_minutes, started_at, focus_rating)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO sessions
+            (segment_id, description, duration_minutes, started_at, focus_rating,
+             completed_at, started_ts, completed_ts, utc_offset)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (segment_id, description, duration_minutes, started_at.isoformat(), focus_rating)
+        (
+            segment_id, description, duration_minutes, started_at.isoformat(), focus_rating,
+            completed_at.strftime("%Y-%m-%d %H:%M:%S"), started_ts, int(completed_at.timestamp()),
+            utc_offset
+        )
     )
     session_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    _rollup_sessions(cursor, "id = ?", (session_id,))
     return session_id
 
 
-def get_today_sessions() -> list[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    today = datetime.now().strftime("%Y-%m-%d")
-    cursor.execute(
-        """
-        SELECT s.*, seg.name as segment_name, seg.color as segment_color
-        FROM sessions s
-        JOIN segments seg ON s.segment_id = seg.id
-        WHERE date(s.completed_at) = ?
-        ORDER BY s.started_at ASC
-        """,
-        (today,)
+def _local_timestamp(started_at: datetime) -> tuple[int, int]:
+    # (epoch seconds, UTC offset in seconds) of a naive local wall-clock time
+    local = started_at.astimezone()
+    return int(local.timestamp()), int(local.utcoffset().total_seconds())
+
+
+def _bulk_row(session: dict) -> tuple:
+    started_at = session["started_at"]
+    if isinstance(started_at, str):
+        started_at = datetime.fromisoformat(started_at)
+    if started_at.tzinfo is not None:
+        # Sessions store local wall-clock start times, like the timer writes them
+        started_at = started_at.astimezone().replace(tzinfo=None)
+    duration_minutes = int(session.get("duration_minutes") or 25)
+    
+    # completed_at is UTC text, matching SQLite's CURRENT_TIMESTAMP default
+    completed_at = session.get("completed_at")
+    if completed_at is None:
+        completed_at = started_at + timedelta(minutes=duration_minutes)
+    elif isinstance(completed_at, str):
+        completed_at = datetime.fromisoformat(completed_at)
+        if completed_at.tzinfo is None:
+            completed_at = completed_at.replace(tzinfo=timezone.utc)
+    completed_at = completed_at.astimezone(timezone.utc)
+    
+    started_ts, utc_offset = _local_timestamp(started_at)
+    started_at = started_at.isoformat()
+    segment_id = session["segment_id"]
+    return (
+        segment_id, session.get("description"), duration_minutes,
+        int(session.get("focus_rating") or 3), started_at,
+        completed_at.strftime("%Y-%m-%d %H:%M:%S"),
+        started_ts, int(completed_at.timestamp()), utc_offset,
+        started_at, segment_id
     )
-    sessions = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+
+
+@instrumented
+def save_sessions_bulk(sessions: Iterable[dict], skip_duplicates: bool = True) -> int:
+    # Everything goes in under one write transaction; a session whose
+    # (started_at, segment_id) is already stored counts as a duplicate
+    insert_sql = """
+        INSERT INTO sessions
+            (segment_id, description, duration_minutes, focus_rating, started_at, completed_at,
+             started_ts, completed_ts, utc_offset)
+        SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?
+    """
+    if skip_duplicates:
+        insert_sql += """
+        WHERE NOT EXISTS (
+            SELECT 1 FROM sessions WHERE started_at = ? AND segment_id = ?
+        )
+        """
+    
+    rows = map(_bulk_row, sessions)
+    inserted = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM sessions")
+            last_id = cursor.fetchone()[0]
+            
+            while batch := list(islice(rows, BULK_BATCH_SIZE)):
+                if not skip_duplicates:
+                    batch = [row[:9] for row in batch]
+                cursor.executemany(insert_sql, batch)
+                inserted += cursor.rowcount
+            
+            _rollup_sessions(cursor, "id > ?", (last_id,))
+            conn.commit()
+            _bump_data_generation()
+        except BaseException:
+            conn.rollback()
+            raise
+    return inserted
+
+
+class SessionWriter:
+    """Background thread that commits queued session saves in batches."""
+    
+    _STOP = object()
+    
+    def __init__(self, max_pending: int = WRITE_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+    
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="session-writer", daemon=True
+                )
+                self._thread.start()
+    
+    def submit(
+        self,
+        segment_id: int,
+        description: str,
+        duration_minutes: int,
+        started_at: datetime,
+        focus_rating: int = 3
+    ) -> Future:
+        """Queue a save_session call; the future resolves to the new session id."""
+        future = Future()
+        self._ensure_started()
+        self._queue.put((future, (segment_id, description, duration_minutes, started_at, focus_rating)))
+        return future
+    
+    def flush(self, timeout: float = None):
+        """
+        Block until everything submitted so far has been written. Raises the
+        write's exception if the last batch failed, TimeoutError on timeout.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return
+        marker = Future()
+        self._queue.put((marker, None))
+        marker.result(timeout)
+    
+    def close(self, timeout: float = None):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = None
+            return
+        try:
+            self.flush(timeout)
+        finally:
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                pass  # the writer is stuck; don't wait on it twice
+            else:
+                self._thread.join(timeout)
+            self._thread = None
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is already waiting into the same commit
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            items = [item for item in batch if item is not self._STOP]
+            saves = [item for item in items if item[1] is not None]
+            error = None
+            try:
+                self._write(saves)
+            except Exception as exc:
+                error = exc
+                if len(saves) > 1 and not _is_busy(exc):
+                    # Probably one bad session: save the rest one at a time
+                    # so only its future fails
+                    error = None
+                    for save in saves:
+                        try:
+                            self._write([save])
+                        except Exception as exc:
+                            error = exc
+                            self._fail([save], exc)
+                else:
+                    self._fail(saves, exc)
+            # Keep serving; a flush waiting on this batch reports any failure
+            for future, args in items:
+                if args is None:  # flush marker
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+            if len(items) < len(batch):
+                return
+    
+    @staticmethod
+    def _fail(saves: list, exc: Exception):
+        logger.error("Dropping %d queued sessions", len(saves), exc_info=exc)
+        for future, _ in saves:
+            future.set_exception(exc)
+    
+    def _write(self, batch: list):
+        # Commits the whole batch or raises, retrying while the database is busy
+        if not batch:
+            return
+        for attempt in range(WRITE_RETRIES):
+            try:
+                with get_connection() as conn:
+                    cursor = conn.cursor()
+                    ids = [_insert_session(cursor, *args) for _, args in batch]
+                    conn.commit()
+                break
+            except sqlite3.OperationalError as exc:
+                if not _is_busy(exc) or attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.1 * 2 ** attempt)
+        for (future, _), session_id in zip(batch, ids):
+            future.set_result(session_id)
+        try:
+            _bump_data_generation()
+        except Exception:
+            # Committed already; raising would have the batch written again
+            logger.exception("Could not bump the data generation after a save")
+
+
+def _is_busy(exc: Exception) -> bool:
+    return isinstance(exc, sqlite3.OperationalError) and ("locked" in str(exc) or "busy" in str(exc))
+
+
+_session_writer = None
+_session_writer_lock = threading.Lock()
+
+
+def get_session_writer() -> SessionWriter:
+    global _session_writer
+    with _session_writer_lock:
+        if _session_writer is None:
+            _session_writer = SessionWriter()
+            # Registered after close_connections, so it runs first at exit
+            atexit.register(_close_session_writer)
+    return _session_writer
+
+
+def _close_session_writer():
+    try:
+        _session_writer.close(10)
+    except Exception:
+        logger.exception("Queued sessions were not all saved before exit")
+
+
+metrics.Gauge(
+    "pomodoro_write_queue_pending", "Session saves waiting in the write-behind queue",
+    lambda: _session_writer.pending if _session_writer else 0
+)
+
+
+def _day_bounds(start_date: str, end_date: str) -> tuple[int, int]:
+    # Half-open bounds on started_ts + utc_offset (the local clock a session
+    # was recorded on) from the start of start_date to the end of end_date.
+    # A session's day is the one its rollup uses, whatever the current
+    # timezone; plain arithmetic, so any YYYY-MM-DD date is in range.
+    start = (datetime.strptime(start_date, "%Y-%m-%d") - _LOCAL_EPOCH).days * 86400
+    end = (datetime.strptime(end_date, "%Y-%m-%d") - _LOCAL_EPOCH).days * 86400 + 86400
+    return start, end
+
+
+@instrumented
+def get_today_sessions() -> list[dict]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        today = datetime.now().strftime("%Y-%m-%d")
+        cursor.execute(
+            """
+            SELECT * FROM sessions
+            WHERE started_ts + utc_offset >= ? AND started_ts + utc_offset < ?
+            ORDER BY started_ts + utc_offset ASC
+            """,
+            _day_bounds(today, today)
+        )
+        sessions = [dict(row) for row in cursor.fetchall()]
     return sessions
 
 
-def get_time_segment(hour: int) -> str:
-    if 6 <= hour < 12:
-        return "morning"
-    elif 12 <= hour < 18:
-        return "afternoon"
-    elif 18 <= hour < 24:
-        return "evening"
-    else:  # 0 <= hour < 6
-        return "midnight"
+def _parse_bucket(bucket: dict) -> dict:
+    start = bucket["start"]
+    if isinstance(start, int):
+        hour, minute = start, 0
+    else:
+        hour, minute = (int(part) for part in str(start).split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"bad start time {start!r}")
+    return {"key": str(bucket["key"]), "label": str(bucket.get("label", bucket["key"])), "start_minute": hour * 60 + minute}
 
 
-def get_today_sessions_by_time_segment() -> dict:
-    sessions = get_today_sessions()
+def get_time_buckets() -> list[dict]:
+    """Configured time-of-day buckets: key, label and start_minute (minutes after midnight)."""
+    global _time_buckets
+    try:
+        mtime = CONFIG_PATH.stat().st_mtime
+    except OSError:
+        mtime = None
+    cached_mtime, buckets = _time_buckets
+    if buckets is not None and mtime == cached_mtime:
+        return buckets
     
-    time_segments = {
-        "morning": {"label": "Morning (6 AM - 12 PM)", "sessions": [], "count": 0, "minutes": 0},
-        "afternoon": {"label": "Afternoon (12 PM - 6 PM)", "sessions": [], "count": 0, "minutes": 0},
-        "evening": {"label": "Evening (6 PM - 12 AM)", "sessions": [], "count": 0, "minutes": 0},
-        "midnight": {"label": "Midnight (12 AM - 6 AM)", "sessions": [], "count": 0, "minutes": 0},
-    }
+    buckets = None
+    if mtime is not None:
+        try:
+            configured = json.loads(CONFIG_PATH.read_text()).get("time_buckets")
+            if configured:
+                buckets = [_parse_bucket(bucket) for bucket in configured]
+                if len({b["key"] for b in buckets}) != len(buckets):
+                    raise ValueError("bucket keys must be unique")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as exc:
+            logger.warning("Ignoring time_buckets in %s: %s", CONFIG_PATH, exc)
+            buckets = None
+    if buckets is None:
+        buckets = [_parse_bucket(bucket) for bucket in DEFAULT_TIME_BUCKETS]
     
-    for session in sessions:
-        started_at = datetime.fromisoformat(session["started_at"])
-        hour = started_at.hour
-        segment = get_time_segment(hour)
+    if cached_mtime != mtime and _time_buckets[1] is not None:
+        # Cached day views were bucketed under the old boundaries
+        _bump_data_generation()
+    _time_buckets = (mtime, buckets)
+    return buckets
+
+
+def get_time_segment(hour: int, minute: int = 0) -> str:
+    minute_of_day = hour * 60 + minute
+    latest_first = sorted(get_time_buckets(), key=lambda b: b["start_minute"], reverse=True)
+    for bucket in latest_first:
+        if minute_of_day >= bucket["start_minute"]:
+            return bucket["key"]
+    return latest_first[0]["key"]
+
+
+def _bucketed_sessions(buckets: list[dict], start_date: str, end_date: str) -> tuple[str, list]:
+    # CTE "day": sessions that started in the range (local days) with the key
+    # of their time-of-day bucket. Before the earliest start wraps around to
+    # the latest bucket, as in get_time_segment.
+    latest_first = sorted(buckets, key=lambda b: b["start_minute"], reverse=True)
+    whens = " ".join("WHEN minute_of_day >= ? THEN ?" for _ in latest_first)
+    sql = f"""
+        WITH timed AS (
+            SELECT id, segment_id, description, duration_minutes, focus_rating,
+                   started_at, completed_at, started_ts,
+                   (started_ts + utc_offset) % 86400 / 60 AS minute_of_day
+            FROM sessions
+            WHERE started_ts + utc_offset >= ? AND started_ts + utc_offset < ?
+        ),
+        day AS (
+            SELECT id, segment_id, description, duration_minutes, focus_rating,
+                   started_at, completed_at, started_ts,
+                   CASE {whens} ELSE ? END AS bucket
+            FROM timed
+        )
+    """
+    params = [*_day_bounds(start_date, end_date)]
+    for bucket in latest_first:
+        params += [bucket["start_minute"], bucket["key"]]
+    params.append(latest_first[0]["key"])
+    return sql, params
+
+
+@instrumented
+def get_sessions_by_time_bucket(start_date: str, end_date: str, page_size: int = DAY_PAGE_SIZE) -> dict:
+    """
+    Sessions started between two days (inclusive), grouped into time-of-day
+    buckets in configured order. Each bucket has its count, minutes and focus
+    average, plus its first page_size sessions by start time (all if None)
+    and whether there are more.
+    """
+    buckets = get_time_buckets()
+    day_sql, params = _bucketed_sessions(buckets, start_date, end_date)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            {day_sql}
+            SELECT bucket, COUNT(*), SUM(duration_minutes), AVG(focus_rating)
+            FROM day
+            GROUP BY bucket
+            """,
+            params
+        )
+        totals = {key: (count, minutes, focus) for key, count, minutes, focus in cursor}
         
-        time_segments[segment]["sessions"].append(session)
-        time_segments[segment]["count"] += 1
-        time_segments[segment]["minutes"] += session["duration_minutes"]
+        page_filter = "" if page_size is None else "WHERE position <= ?"
+        cursor.execute(
+            f"""
+            {day_sql}
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY started_ts) AS position
+                FROM day
+            )
+            {page_filter}
+            ORDER BY bucket, position
+            """,
+            params if page_size is None else [*params, page_size]
+        )
+        pages = {}
+        for row in cursor.fetchall():
+            session = dict(row)
+            del session["position"]
+            pages.setdefault(session.pop("bucket"), []).append(session)
     
-    return time_segments
+    result = []
+    for bucket in buckets:
+        count, minutes, focus = totals.get(bucket["key"], (0, 0, None))
+        sessions = pages.get(bucket["key"], [])
+        result.append({
+            "key": bucket["key"],
+            "label": bucket["label"],
+            "count": count,
+            "minutes": minutes,
+            "focus_avg": round(focus, 2) if focus is not None else None,
+            "sessions": sessions,
+            "has_more": len(sessions) < count,
+        })
+    total_minutes = sum(bucket["minutes"] for bucket in result)
+    return {
+        "start": start_date,
+        "end": end_date,
+        "total_pomodoros": sum(bucket["count"] for bucket in result),
+        "total_minutes": total_minutes,
+        "total_hours": round(total_minutes / 60, 1),
+        "buckets": result,
+    }
+
+
+@instrumented
+def get_time_bucket_sessions(
+    start_date: str,
+    end_date: str,
+    bucket: str,
+    limit: int = DAY_PAGE_SIZE,
+    offset: int = 0
+) -> list[dict]:
+    """One page of a bucket's sessions from get_sessions_by_time_bucket."""
+    day_sql, params = _bucketed_sessions(get_time_buckets(), start_date, end_date)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            {day_sql}
+            SELECT id, segment_id, description, duration_minutes, focus_rating,
+                   started_at, completed_at, started_ts
+            FROM day
+            WHERE bucket = ?
+            ORDER BY started_ts
+            LIMIT ? OFFSET ?
+            """,
+            [*params, bucket, limit, offset]
+        )
+        sessions = [dict(row) for row in cursor.fetchall()]
+    return sessions
+
+
+@instrumented
+def get_today_sessions_by_time_segment() -> dict:
+    today = datetime.now().strftime("%Y-%m-%d")
+    view = get_sessions_by_time_bucket(today, today, page_size=None)
+    return {
+        bucket["key"]: {
+            "label": bucket["label"],
+            "sessions": bucket["sessions"],
+            "count": bucket["count"],
+            "minutes": bucket["minutes"],
+        }
+        for bucket in view["buckets"]
+    }
 
 
+@instrumented
 def get_sessions_by_date_range(start_date: str, end_date: str) -> list[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT s.*, seg.name as segment_name, seg.color as segment_color
-        FROM sessions s
-        JOIN segments seg ON s.segment_id = seg.id
-        WHERE date(s.completed_at) BETWEEN ? AND ?
-        ORDER BY s.completed_at DESC
-        """,
-        (start_date, end_date)
-    )
-    sessions = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT * FROM sessions
+            WHERE started_ts + utc_offset >= ? AND started_ts + utc_offset < ?
+            ORDER BY started_ts + utc_offset DESC
+            """,
+            _day_bounds(start_date, end_date)
+        )
+        sessions = [dict(row) for row in cursor.fetchall()]
     return sessions
 
 
+def iter_sessions(start_date: str, end_date: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[dict]:
+    # Streams rows off the cursor so memory stays flat however long the range;
+    # the pooled connection is held until the generator is exhausted or closed
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        names = {segment_id: seg["name"] for segment_id, seg in _segment_map(cursor).items()}
+        cursor.execute(
+            """
+            SELECT id, segment_id, description, duration_minutes,
+                   focus_rating, started_at, completed_at
+            FROM sessions
+            WHERE started_ts + utc_offset >= ? AND started_ts + utc_offset < ?
+            ORDER BY started_ts + utc_offset ASC
+            """,
+            _day_bounds(start_date, end_date)
+        )
+        while rows := cursor.fetchmany(batch_size):
+            for session_id, segment_id, description, duration, focus, started_at, completed_at in rows:
+                yield {
+                    "id": session_id,
+                    "segment": names.get(segment_id),
+                    "description": description,
+                    "duration_minutes": duration,
+                    "focus_rating": focus,
+                    "started_at": started_at,
+                    "completed_at": completed_at,
+                }
+
+
+def _fts_query(text: str) -> str:
+    # Plain words only, each quoted so FTS5 syntax in user input is taken
+    # literally; the last word also matches as a prefix, for search-as-you-type
+    terms = [f'"{term}"' for term in re.findall(r"\w+", text)]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+@instrumented
+def search_sessions(
+    query: str,
+    segment_id: int = None,
+    start_date: str = None,
+    end_date: str = None,
+    limit: int = SEARCH_PAGE_SIZE,
+    offset: int = 0
+) -> dict:
+    """
+    Sessions whose description matches every word of query, best match first
+    (newest first once there are more than SEARCH_RANK_LIMIT matches).
+    
+    Each result carries snippet_html: the matching part of the description,
+    HTML-escaped, with matched words wrapped in <mark>. Dates are YYYY-MM-DD
+    on the local start day, both optional and inclusive.
+    """
+    match = _fts_query(query)
+    result = {"query": query, "total": 0, "offset": offset, "limit": limit, "results": []}
+    if not match:
+        return result
+    
+    filters, params = [], []
+    if segment_id is not None:
+        filters.append("s.segment_id = ?")
+        params.append(segment_id)
+    if start_date:
+        filters.append("s.started_ts + s.utc_offset >= ?")
+        params.append(_day_bounds(start_date, start_date)[0])
+    if end_date:
+        filters.append("s.started_ts + s.utc_offset < ?")
+        params.append(_day_bounds(end_date, end_date)[1])
+    
+    columns = "s.id, s.segment_id, s.description, s.duration_minutes, s.focus_rating, s.started_at, s.completed_at"
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if _has_table(cursor, "sessions_fts"):
+            where = " AND ".join(["sessions_fts MATCH ?", *filters])
+            where_params = [match, *params]
+            source = "sessions_fts JOIN sessions s ON s.id = sessions_fts.rowid"
+            ranked = f"""
+                SELECT {columns}, snippet(sessions_fts, 0, char(2), char(3), '…', 16) AS snippet
+                FROM {source} WHERE {where}
+                ORDER BY {{order}}
+                LIMIT ? OFFSET ?
+            """
+        else:
+            # No FTS5 in this SQLite: a scan, newest first, without snippets
+            terms = re.findall(r"\w+", query)
+            where = " AND ".join(["s.description LIKE ?"] * len(terms) + filters)
+            where_params = [f"%{term}%" for term in terms] + params
+            source = "sessions s"
+            ranked = f"""
+                SELECT {columns}, s.description AS snippet
+                FROM {source} WHERE {where}
+                ORDER BY s.started_ts + s.utc_offset DESC
+                LIMIT ? OFFSET ?
+            """
+        
+        cursor.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", where_params)
+        result["total"] = cursor.fetchone()[0]
+        order = "bm25(sessions_fts)" if result["total"] <= SEARCH_RANK_LIMIT else "sessions_fts.rowid DESC"
+        cursor.execute(ranked.format(order=order), (*where_params, limit, offset))
+        for row in cursor.fetchall():
+            session = dict(row)
+            snippet = html.escape(session.pop("snippet") or "")
+            session["snippet_html"] = snippet.replace("\x02", "<mark>").replace("\x03", "</mark>")
+            result["results"].append(session)
+    return result
+
+
+@instrumented
+def get_period_stats(start_date: str, end_date: str) -> dict:
+    # Both breakdowns are aggregated by SQLite straight off the rollups
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        registry = _segment_map(cursor)
+        cursor.execute(
+            """
+            SELECT segment_id, SUM(minutes), SUM(count)
+            FROM daily_segment_stats
+            WHERE day BETWEEN ? AND ?
+            GROUP BY segment_id
+            ORDER BY segment_id
+            """,
+            (start_date, end_date)
+        )
+        segments = [
+            {
+                "id": segment_id,
+                "name": registry[segment_id]["name"],
+                "color": registry[segment_id]["color"],
+                "minutes": minutes,
+                "count": count,
+            }
+            for segment_id, minutes, count in cursor
+            if segment_id in registry
+        ]
+        
+        cursor.execute(
+            """
+            SELECT day, SUM(minutes), SUM(count)
+            FROM daily_segment_stats
+            WHERE day BETWEEN ? AND ?
+            GROUP BY day
+            """,
+            (start_date, end_date)
+        )
+        daily_stats = {day: {"minutes": minutes, "count": count} for day, minutes, count in cursor}
+    
+    total_minutes = sum(seg["minutes"] for seg in segments)
+    
+    return {
+        "total_minutes": total_minutes,
+        "total_hours": round(total_minutes / 60, 1),
+        "total_pomodoros": sum(seg["count"] for seg in segments),
+        "segments": segments,
+        "daily": daily_stats,
+        "best_day_count": max((d["count"] for d in daily_stats.values()), default=0)
+    }
+
+
+@instrumented
 def get_today_stats() -> dict:
     sessions = get_today_sessions()
+    registry = get_segment_map()
     
     total_minutes = sum(s["duration_minutes"] for s in sessions)
     total_pomodoros = len(sessions)
     
     segment_stats = {}
     for session in sessions:
-        seg_name = session["segment_name"]
-        if seg_name not in segment_stats:
-            segment_stats[seg_name] = {
-                "name": seg_name,
-                "color": session["segment_color"],
+        seg_id = session["segment_id"]
+        if seg_id not in segment_stats:
+            segment = registry.get(seg_id, {"name": "", "color": "#666666"})
+            segment_stats[seg_id] = {
+                "id": seg_id,
+                "name": segment["name"],
+                "color": segment["color"],
                 "minutes": 0,
                 "count": 0,
                 "descriptions": []
             }
-        segment_stats[seg_name]["minutes"] += session["duration_minutes"]
-        segment_stats[seg_name]["count"] += 1
+        segment_stats[seg_id]["minutes"] += session["duration_minutes"]
+        segment_stats[seg_id]["count"] += 1
         if session["description"]:
-            segment_stats[seg_name]["descriptions"].append(session["description"])
+            segment_stats[seg_id]["descriptions"].append(session["description"])
     
     return {
         "total_minutes": total_minutes,
@@ -204,6 +1495,7 @@ def get_today_stats() -> dict:
     }
 
 
+@instrumented
 def get_weekly_stats() -> dict:
     today = datetime.now()
     monday = today - timedelta(days=today.weekday())
@@ -212,40 +1504,9 @@ def get_weekly_stats() -> dict:
     start_date = monday.strftime("%Y-%m-%d")
     end_date = sunday.strftime("%Y-%m-%d")
     
-    sessions = get_sessions_by_date_range(start_date, end_date)
-    
-    total_minutes = sum(s["duration_minutes"] for s in sessions)
-    
-    segment_stats = {}
-    for session in sessions:
-        seg_name = session["segment_name"]
-        if seg_name not in segment_stats:
-            segment_stats[seg_name] = {
-                "name": seg_name,
-                "color": session["segment_color"],
-                "minutes": 0,
-                "count": 0
-            }
-        segment_stats[seg_name]["minutes"] += session["duration_minutes"]
-        segment_stats[seg_name]["count"] += 1
-    
-    daily_stats = {}
-    for session in sessions:
-        day = session["completed_at"][:10]
-        if day not in daily_stats:
-            daily_stats[day] = {"minutes": 0, "count": 0}
-        daily_stats[day]["minutes"] += session["duration_minutes"]
-        daily_stats[day]["count"] += 1
-    
     return {
         "week_start": start_date,
         "week_end": end_date,
-        "total_minutes": total_minutes,
-        "total_hours": round(total_minutes / 60, 1),
-        "total_pomodoros": len(sessions),
-        "segments": list(segment_stats.values()),
-        "daily": daily_stats
+        **get_period_stats(start_date, end_date)
     }
 
-
-init_db()
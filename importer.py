@@ -0,0 +1,121 @@
+"""
+Session importer - streams CSV / JSONL history into the database in chunks
+"""
+
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+from database import add_segment, get_segments, save_sessions_bulk
+
+CHUNK_SIZE = 10000
+
+# Records outside these are skipped rather than stored
+MAX_DURATION_MINUTES = 24 * 60
+FOCUS_RATINGS = range(1, 6)
+
+
+def read_records(path: Path) -> Iterator:
+    """
+    Yield raw records from a .csv or .jsonl/.ndjson file, one at a time: a
+    dict per CSV row, the unparsed text of each JSONL line (parsed per record
+    by the importer, so one bad line is skipped rather than ending the file).
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.suffix.lower() == '.csv':
+            yield from csv.DictReader(f)
+        elif path.suffix.lower() in ('.jsonl', '.ndjson'):
+            for line in f:
+                if line.strip():
+                    yield line
+        else:
+            raise ValueError(f"Unsupported file type: {path.name} (expected .csv or .jsonl)")
+
+
+class SessionImporter:
+    """Resolves segment names and feeds records to save_sessions_bulk."""
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, create_segments: bool = False):
+        self.chunk_size = chunk_size
+        self.create_segments = create_segments
+        self.segment_ids = {s['name'].lower(): s['id'] for s in get_segments()}
+        self.known_segments = set(self.segment_ids.values())
+        self.stats = {'read': 0, 'imported': 0, 'duplicates': 0, 'skipped': 0}
+
+    def _resolve_segment(self, record: dict):
+        segment_id = _integer(record.get('segment_id'), None)
+        if segment_id is not None:
+            return segment_id
+        name = (record.get('segment') or record.get('segment_name') or '').strip()
+        if not name:
+            return None
+        segment_id = self.segment_ids.get(name.lower())
+        if segment_id is None and self.create_segments:
+            segment_id = add_segment(name)
+            self.segment_ids[name.lower()] = segment_id
+            self.known_segments.add(segment_id)
+        return segment_id
+
+    def _session(self, record) -> dict:
+        """The session to store for a record; ValueError if it can't be stored."""
+        if isinstance(record, str):
+            record = json.loads(record)
+        if not isinstance(record, dict):
+            raise TypeError(f"expected an object, got {type(record).__name__}")
+        segment_id = self._resolve_segment(record)
+        if segment_id not in self.known_segments:
+            raise ValueError(f"unknown segment: {segment_id}")
+        started_at = datetime.fromisoformat(record['started_at'])
+        started_at.astimezone()  # out-of-range dates raise here, not mid-chunk
+        completed_at = record.get('completed_at') or None
+        if completed_at is not None:
+            datetime.fromisoformat(completed_at).astimezone()
+        duration_minutes = _integer(record.get('duration_minutes'), 25)
+        if not 0 < duration_minutes <= MAX_DURATION_MINUTES:
+            raise ValueError(f"duration out of range: {duration_minutes}")
+        focus_rating = _integer(record.get('focus_rating'), 3)
+        if focus_rating not in FOCUS_RATINGS:
+            raise ValueError(f"focus rating out of range: {focus_rating}")
+        return {
+            'segment_id': segment_id,
+            'description': record.get('description') or None,
+            'duration_minutes': duration_minutes,
+            'focus_rating': focus_rating,
+            'started_at': started_at,
+            'completed_at': completed_at,
+        }
+
+    def _sessions(self, records: Iterator) -> Iterator[dict]:
+        for record in records:
+            self.stats['read'] += 1
+            try:
+                session = self._session(record)
+            except (KeyError, TypeError, ValueError, OverflowError, OSError):
+                self.stats['skipped'] += 1
+                continue
+            yield session
+
+    def import_file(self, path: Path) -> dict:
+        sessions = self._sessions(read_records(path))
+        while chunk := list(islice(sessions, self.chunk_size)):
+            imported = save_sessions_bulk(chunk)
+            self.stats['imported'] += imported
+            self.stats['duplicates'] += len(chunk) - imported
+        return self.stats
+
+
+def _integer(value, default: int) -> int:
+    # Whole numbers only: "25" and 25 pass, "2.5" and true do not
+    if value is None or value == '':
+        return default
+    return int(str(value))
+
+
+def import_files(paths: list[Path], chunk_size: int = CHUNK_SIZE, create_segments: bool = False) -> dict:
+    importer = SessionImporter(chunk_size=chunk_size, create_segments=create_segments)
+    for path in paths:
+        importer.import_file(Path(path))
+    return importer.stats
@@ -1,30 +1,109 @@
 import threading
 import argparse
-from dashboard import run_dashboard
-from timer_widget import PomodoroTimer
+
+
+# Each mode imports its UI/server module only when it runs, so --timer-only
+# never loads Flask and --dashboard-only never loads Tk
+def run_timer():
+    from timer_widget import PomodoroTimer
+    app = PomodoroTimer()
+    app.run()
+
+
+def migrate(dry_run: bool):
+    import database
+    plan = database.migration_plan()
+    print(f"Database: {plan['database']}")
+    if not plan['exists']:
+        print(f"No database yet; it will be created at schema version {plan['target_version']}")
+        if dry_run:
+            return
+    else:
+        print(f"Schema version {plan['current_version']}, latest {plan['target_version']}")
+    for step in plan['migrations']:
+        backfill = f" (may backfill up to {plan['max_session_id']} sessions)" if step['may_backfill'] else ""
+        print(f"  migration {step['version']}: {step['description']}{backfill}")
+    for backfill in plan['backfills']:
+        print(f"  resume backfill {backfill['version']}: {backfill['description']} "
+              f"(at id {backfill['done_id']} of {backfill['end_id']})")
+    if dry_run:
+        if not plan['migrations'] and not plan['backfills']:
+            print("Nothing to do")
+        return
+    
+    # Backfill in the foreground, with progress, instead of on a thread
+    database.BACKGROUND_BACKFILLS = False
+    database.init_db()
+    database.run_backfills(
+        progress=lambda version, done, end: print(f"  backfill {version}: {done}/{end}")
+    )
+    print(f"Schema is at version {database.SCHEMA_VERSION}")
+
 
 def main():
     parser = argparse.ArgumentParser(description='Pomodoro Focus Tracker')
     parser.add_argument('--dashboard-only', action='store_true', help='Run only the dashboard')
     parser.add_argument('--timer-only', action='store_true', help='Run only the timer widget')
     parser.add_argument('--port', type=int, default=5050, help='Dashboard port (default: 5050)')
+    parser.add_argument('--server', choices=['dev', 'waitress', 'gunicorn'], default='dev',
+                        help='Dashboard server: Flask dev server, waitress (threaded) or gunicorn (multi-process, --dashboard-only)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes (default: 2)')
+    parser.add_argument('--threads', type=int, default=8, help='Request threads per worker (default: 8)')
+    parser.add_argument('--keep-alive', type=int, default=60, help='Seconds to keep idle connections open (default: 60)')
+    
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('rebuild-stats', help='Rebuild the daily rollups from all recorded sessions')
+    migrate_parser = subparsers.add_parser('migrate', help='Bring the database schema up to date')
+    migrate_parser.add_argument('--dry-run', action='store_true', help='Show pending migrations and backfills without applying them')
+    import_parser = subparsers.add_parser('import', help='Import sessions from CSV or JSONL files')
+    import_parser.add_argument('files', nargs='+', help='.csv or .jsonl files to import')
+    import_parser.add_argument('--chunk-size', type=int, help='Sessions per transaction (default: 10000)')
+    import_parser.add_argument('--create-segments', action='store_true', help='Create segments that do not exist yet')
     args = parser.parse_args()
     
-    if args.dashboard_only:
-        run_dashboard(port=args.port)
+    if args.server == 'gunicorn' and not args.dashboard_only:
+        parser.error('--server gunicorn forks worker processes and needs --dashboard-only')
+    
+    dashboard_options = {
+        'port': args.port,
+        'server': args.server,
+        'workers': args.workers,
+        'threads': args.threads,
+        'keep_alive': args.keep_alive,
+    }
+    
+    if args.command == 'rebuild-stats':
+        from database import rebuild_daily_stats
+        rows = rebuild_daily_stats()
+        print(f"Rebuilt {rows} daily segment rollups")
+    elif args.command == 'migrate':
+        migrate(args.dry_run)
+    elif args.command == 'import':
+        from importer import CHUNK_SIZE, import_files
+        stats = import_files(
+            args.files,
+            chunk_size=args.chunk_size or CHUNK_SIZE,
+            create_segments=args.create_segments
+        )
+        print(
+            f"Read {stats['read']} sessions: {stats['imported']} imported, "
+            f"{stats['duplicates']} duplicates, {stats['skipped']} skipped"
+        )
+    elif args.dashboard_only:
+        from dashboard import run_dashboard
+        run_dashboard(**dashboard_options)
     elif args.timer_only:
-        app = PomodoroTimer()
-        app.run()
+        run_timer()
     else:
+        from dashboard import run_dashboard
         dashboard_thread = threading.Thread(
             target=run_dashboard,
-            kwargs={'port': args.port},
+            kwargs=dashboard_options,
             daemon=True
         )
         dashboard_thread.start()
         
-        app = PomodoroTimer()
-        app.run()
+        run_timer()
 
 
 if __name__ == "__main__":
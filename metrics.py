@@ -0,0 +1,101 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format
+"""
+
+import threading
+
+# Seconds; covers sub-millisecond SQLite reads up to slow dashboard requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_lock = threading.Lock()
+_registry = []
+
+
+def _format_labels(labels: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(labels)} {value}"
+
+
+class Gauge:
+    """Value read from a callback each time metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        _registry.append(self)
+
+    def samples(self):
+        yield f"{self.name} {self.callback()}"
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.values = {}  # labels -> [bucket counts..., +Inf count, sum]
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self):
+        for labels, series in self.values.items():
+            bounds = [*self.buckets, "+Inf"]
+            for bound, count in zip(bounds, series):
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_format_labels(labels, le)} {count}"
+            yield f"{self.name}_sum{_format_labels(labels)} {series[-1]}"
+            yield f"{self.name}_count{_format_labels(labels)} {series[-2]}"
+
+
+def render() -> str:
+    lines = []
+    with _lock:
+        for metric in _registry:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
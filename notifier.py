@@ -0,0 +1,145 @@
+"""
+Asynchronous sounds and desktop notifications for the timer widget
+"""
+
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Identical alerts inside this many seconds are delivered once
+COALESCE_WINDOW = 2.0
+
+DELIVERY_SECONDS = metrics.Histogram(
+    "pomodoro_notification_delivery_seconds", "Time from request to delivered sound/notification"
+)
+NOTIFICATIONS = metrics.Counter(
+    "pomodoro_notifications_total", "Sounds and notifications by kind and outcome"
+)
+
+
+class NullBackend:
+    """Delivers nothing; remembers what it was asked to deliver (for tests)."""
+
+    plays_sound = False
+
+    def __init__(self):
+        self.delivered = []
+
+    def play_sound(self):
+        self.delivered.append(("sound",))
+
+    def notify(self, title: str, message: str):
+        self.delivered.append(("notify", title, message))
+
+
+def _applescript_string(text: str) -> str:
+    # AppleScript literals only need backslashes and quotes escaped; anything
+    # else, non-ASCII text included, goes in as-is
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class MacBackend:
+    """afplay for sounds, osascript for Notification Center."""
+
+    plays_sound = True
+
+    def play_sound(self):
+        subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], capture_output=True)
+
+    def notify(self, title: str, message: str):
+        script = f'display notification {_applescript_string(message)} with title {_applescript_string(title)}'
+        subprocess.run(['osascript', '-e', script], capture_output=True)
+
+
+class LinuxBackend:
+    """notify-send for notifications, canberra/PulseAudio for sounds."""
+
+    SOUND_FILE = '/usr/share/sounds/freedesktop/stereo/complete.oga'
+
+    def __init__(self):
+        self.notify_send = shutil.which('notify-send')
+        if shutil.which('canberra-gtk-play'):
+            self.sound_command = ['canberra-gtk-play', '--id=complete']
+        elif shutil.which('paplay') and os.path.exists(self.SOUND_FILE):
+            self.sound_command = ['paplay', self.SOUND_FILE]
+        else:
+            self.sound_command = None
+        self.plays_sound = self.sound_command is not None
+
+    def play_sound(self):
+        if self.sound_command:
+            subprocess.run(self.sound_command, capture_output=True)
+
+    def notify(self, title: str, message: str):
+        if self.notify_send:
+            subprocess.run([self.notify_send, '--app-name=Pomodoro', title, message], capture_output=True)
+
+
+def default_backend():
+    system = platform.system()
+    if system == 'Darwin':
+        return MacBackend()
+    if system == 'Linux':
+        return LinuxBackend()
+    return NullBackend()
+
+
+class Notifier:
+    """Runs backend calls on a small worker pool so callers never wait on them."""
+
+    def __init__(self, backend=None, workers: int = 2, coalesce_window: float = COALESCE_WINDOW):
+        self.backend = backend or default_backend()
+        self.coalesce_window = coalesce_window
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='notifier')
+        self._last_sent = {}
+        self._lock = threading.Lock()
+
+    @property
+    def plays_sound(self) -> bool:
+        return self.backend.plays_sound
+
+    def play_sound(self):
+        return self._dispatch(('sound',), self.backend.play_sound)
+
+    def notify(self, title: str, message: str):
+        return self._dispatch(('notify', title, message), self.backend.notify, title, message)
+
+    def _dispatch(self, key: tuple, deliver, *args):
+        """Queue a delivery; returns its Future, or None if it was coalesced."""
+        kind = key[0]
+        requested = time.monotonic()
+        with self._lock:
+            last = self._last_sent.get(key)
+            if last is not None and requested - last < self.coalesce_window:
+                NOTIFICATIONS.inc(kind=kind, outcome='coalesced')
+                return None
+            self._last_sent[key] = requested
+
+        def run():
+            try:
+                deliver(*args)
+            except Exception:
+                NOTIFICATIONS.inc(kind=kind, outcome='failed')
+                logger.exception("%s delivery failed", kind)
+                raise
+            latency = time.monotonic() - requested
+            DELIVERY_SECONDS.observe(latency, kind=kind)
+            NOTIFICATIONS.inc(kind=kind, outcome='delivered')
+            logger.debug("%s delivered in %.0f ms", kind, latency * 1000)
+
+        try:
+            return self._executor.submit(run)
+        except RuntimeError:  # already shut down
+            return None
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,200 @@
+"""
+Columnar in-memory copy of session history for analytics
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+import database
+import metrics
+from database import get_connection, get_data_version
+
+# Rows fetched per round trip while loading
+LOAD_BATCH_SIZE = 5000
+
+# Out-of-order new rows up to this many are inserted in place; more re-sort
+INSERT_LIMIT = 1000
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+DAY = 86400
+
+
+def day_start(day: str) -> int:
+    """Local-clock seconds at midnight starting a YYYY-MM-DD day."""
+    return (date.fromisoformat(day).toordinal() - _EPOCH_ORDINAL) * DAY
+
+
+def day_name(seconds: int) -> str:
+    return date.fromordinal(_EPOCH_ORDINAL + seconds // DAY).isoformat()
+
+
+class SessionStore:
+    """
+    Sessions as parallel typed arrays, sorted by start time.
+
+    start holds local wall-clock seconds since 1970-01-01 (started_ts +
+    utc_offset, so start // DAY is the local day the session started), then
+    duration in minutes, segment id and focus rating. About 15 bytes a
+    session instead of a dict per row. Descriptions are not kept.
+
+    Ranges are YYYY-MM-DD days, end inclusive, found by bisecting start.
+    Every read first appends sessions saved since the last one (by id),
+    in this process or another, once the data version has moved.
+    """
+
+    def __init__(self):
+        self.db_path = str(database.DB_PATH)
+        self.start = array('q')
+        self.duration = array('H')
+        self.segment = array('I')
+        self.focus = array('B')
+        self.last_id = 0
+        self._data_version = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self._columns())
+
+    def _columns(self) -> tuple:
+        return self.start, self.duration, self.segment, self.focus
+
+    def refresh(self):
+        version = get_data_version()
+        with self._lock:
+            if version == self._data_version:
+                return
+            self._load_new()
+            self._data_version = version
+
+    def _load_new(self):
+        # Values are clamped to each column's type range in the query, so one
+        # odd row can't make every refresh fail
+        new = tuple(array(column.typecode) for column in self._columns())
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT id, COALESCE(started_ts + utc_offset, CAST(strftime('%s', started_at) AS INTEGER), 0),
+                       MAX(0, MIN(COALESCE(CAST(duration_minutes AS INTEGER), 0), 65535)),
+                       MAX(0, MIN(COALESCE(CAST(segment_id AS INTEGER), 0), 4294967295)),
+                       MAX(0, MIN(COALESCE(CAST(focus_rating AS INTEGER), 0), 255))
+                FROM sessions
+                WHERE id > ?
+                ORDER BY id
+                """,
+                (self.last_id,)
+            )
+            last_id = self.last_id
+            while rows := cursor.fetchmany(LOAD_BATCH_SIZE):
+                for last_id, *values in rows:
+                    for column, value in zip(new, values):
+                        column.append(value)
+        new_start = new[0]
+        if not new_start:
+            return
+
+        in_order = all(a <= b for a, b in zip(new_start, new_start[1:]))
+        if in_order and (not self.start or new_start[0] >= self.start[-1]):
+            # The usual case: sessions saved since the last refresh start later
+            for column, extra in zip(self._columns(), new):
+                column.extend(extra)
+        elif len(new_start) <= INSERT_LIMIT:
+            for values in zip(*new):
+                i = bisect_right(self.start, values[0])
+                for column, value in zip(self._columns(), values):
+                    column.insert(i, value)
+        else:
+            # Imported history lands in the middle; re-sort by start time
+            merged = [column + extra for column, extra in zip(self._columns(), new)]
+            order = sorted(range(len(merged[0])), key=merged[0].__getitem__)
+            self.start, self.duration, self.segment, self.focus = (
+                array(column.typecode, map(column.__getitem__, order)) for column in merged
+            )
+        self.last_id = last_id
+
+    def first_day(self) -> str:
+        """Day of the earliest session, or None while there are none."""
+        self.refresh()
+        with self._lock:
+            return day_name(self.start[0]) if self.start else None
+
+    def _bounds(self, start_date: str, end_date: str) -> tuple[int, int]:
+        lo = bisect_left(self.start, day_start(start_date))
+        hi = bisect_left(self.start, day_start(end_date) + DAY, lo)
+        return lo, hi
+
+    def columns(self, start_date: str, end_date: str) -> dict:
+        """Copies of each column for the range, e.g. for numpy.frombuffer."""
+        self.refresh()
+        with self._lock:
+            lo, hi = self._bounds(start_date, end_date)
+            return {
+                "start": self.start[lo:hi],
+                "duration": self.duration[lo:hi],
+                "segment": self.segment[lo:hi],
+                "focus": self.focus[lo:hi],
+            }
+
+    def totals(self, start_date: str, end_date: str) -> dict:
+        self.refresh()
+        with self._lock:
+            lo, hi = self._bounds(start_date, end_date)
+            minutes = sum(self.duration[lo:hi])
+            return {
+                "count": hi - lo,
+                "minutes": minutes,
+                "focus_avg": round(sum(self.focus[lo:hi]) / (hi - lo), 2) if hi > lo else None,
+            }
+
+    def by_segment(self, start_date: str, end_date: str) -> dict[int, dict]:
+        self.refresh()
+        stats = {}
+        with self._lock:
+            lo, hi = self._bounds(start_date, end_date)
+            for segment_id, minutes in zip(self.segment[lo:hi], self.duration[lo:hi]):
+                entry = stats.get(segment_id)
+                if entry is None:
+                    entry = stats[segment_id] = {"count": 0, "minutes": 0}
+                entry["count"] += 1
+                entry["minutes"] += minutes
+        return stats
+
+    def by_day(self, start_date: str, end_date: str) -> dict[str, dict]:
+        self.refresh()
+        stats = {}
+        with self._lock:
+            lo, hi = self._bounds(start_date, end_date)
+            while lo < hi:
+                # Each day is one contiguous run of the sorted start column
+                day = self.start[lo] // DAY * DAY
+                next_lo = bisect_left(self.start, day + DAY, lo, hi)
+                stats[day_name(day)] = {
+                    "count": next_lo - lo,
+                    "minutes": sum(self.duration[lo:next_lo]),
+                }
+                lo = next_lo
+        return stats
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    global _store
+    with _store_lock:
+        if _store is None or _store.db_path != str(database.DB_PATH):
+            _store = SessionStore()
+    return _store
+
+
+metrics.Gauge(
+    "pomodoro_session_store_bytes", "Memory held by the columnar session store's arrays",
+    lambda: _store.nbytes if _store else 0
+)
@@ -0,0 +1,340 @@
+// Tab switching
+function switchTab(tab) {
+    // Update tab buttons
+    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+    event.target.classList.add('active');
+
+    // Update tab content
+    document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+    document.getElementById(tab + '-tab').classList.add('active');
+
+    // Load data for the tab
+    if (tab === 'day') loadDayData();
+    else if (tab === 'week') loadWeekData();
+    else if (tab === 'month') loadMonthData();
+    else if (tab === 'search') loadSearchData();
+}
+
+// Day view: today by default, stepping a day at a time
+let dayDate = localDateString(new Date());
+
+function localDateString(date) {
+    const pad = n => String(n).padStart(2, '0');
+    return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}`;
+}
+
+function shiftDay(days) {
+    const date = new Date(dayDate + 'T00:00:00');
+    date.setDate(date.getDate() + days);
+    dayDate = localDateString(date);
+    loadDayData();
+}
+
+function renderSessions(sessions, segments) {
+    return sessions.map(session => {
+        const segment = segments[session.segment_id] || { name: '', color: '#666666' };
+        const startTime = new Date(session.started_at).toLocaleTimeString('en-US', {
+            hour: 'numeric',
+            minute: '2-digit',
+            hour12: true
+        });
+        const endTime = new Date(new Date(session.started_at).getTime() + session.duration_minutes * 60000).toLocaleTimeString('en-US', {
+            hour: 'numeric',
+            minute: '2-digit',
+            hour12: true
+        });
+
+        return `
+            <div class="session-item" style="border-left-color: ${segment.color}">
+                <div class="time">${startTime} - ${endTime}</div>
+                <div class="segment-name">${segment.name}</div>
+                <div class="description">${session.description}</div>
+            </div>
+        `;
+    }).join('');
+}
+
+// Load day view data
+async function loadDayData() {
+    const response = await fetch('/api/day?date=' + dayDate);
+    const data = await response.json();
+
+    const isToday = dayDate === localDateString(new Date());
+    document.getElementById('day-title').textContent = isToday ? 'Today' :
+        new Date(dayDate + 'T00:00:00').toLocaleDateString('en-US', {
+            weekday: 'long',
+            month: 'short',
+            day: 'numeric',
+            year: 'numeric'
+        });
+    document.getElementById('day-next').disabled = isToday;
+    document.getElementById('today-cycles').textContent = data.total_pomodoros;
+    document.getElementById('today-hours').textContent = data.total_hours;
+
+    // Render time-of-day buckets in their configured order
+    const container = document.getElementById('time-segments');
+    container.innerHTML = '';
+
+    data.buckets.forEach(bucket => {
+        const div = document.createElement('div');
+        div.className = 'time-segment';
+        div.innerHTML = `
+            <h3>${bucket.label}</h3>
+            <div class="segment-stats">${bucket.count} cycles • ${(bucket.minutes / 60).toFixed(1)} hrs</div>
+            <div class="bucket-sessions">
+                ${bucket.count === 0 ? '<div class="empty-state">No sessions yet</div>' : renderSessions(bucket.sessions, data.segments)}
+            </div>
+        `;
+
+        // Further sessions are fetched a page at a time on request
+        if (bucket.has_more) {
+            const more = document.createElement('button');
+            more.className = 'load-more';
+            more.style.display = 'block';
+            more.textContent = 'Show more';
+            more.dataset.page = 1;
+            more.onclick = () => loadMoreSessions(bucket.key, div.querySelector('.bucket-sessions'), more);
+            div.appendChild(more);
+        }
+
+        container.appendChild(div);
+    });
+}
+
+async function loadMoreSessions(bucket, list, button) {
+    const page = Number(button.dataset.page) + 1;
+    const params = new URLSearchParams({ date: dayDate, bucket: bucket, page: page });
+    const response = await fetch('/api/day/sessions?' + params);
+    const data = await response.json();
+
+    list.insertAdjacentHTML('beforeend', renderSessions(data.sessions, data.segments));
+    button.dataset.page = page;
+    if (!data.has_more) button.remove();
+}
+
+// Load week view data
+async function loadWeekData() {
+    const response = await fetch('/api/week');
+    const data = await response.json();
+
+    document.getElementById('week-cycles').textContent = data.total_pomodoros;
+    document.getElementById('week-hours').textContent = data.total_hours;
+    document.getElementById('week-avg').textContent = Math.round(data.total_pomodoros / 7);
+
+    // Render daily grid
+    const container = document.getElementById('daily-grid');
+    container.innerHTML = '';
+
+    const days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
+    const startDate = new Date(data.week_start + 'T00:00:00');
+
+    for (let i = 0; i < 7; i++) {
+        const date = new Date(startDate);
+        date.setDate(startDate.getDate() + i);
+        const dateStr = localDateString(date);
+        const dayData = data.daily[dateStr] || { count: 0, minutes: 0 };
+
+        const div = document.createElement('div');
+        div.className = 'day-card';
+        div.innerHTML = `
+            <div class="day-name">${days[i]}</div>
+            <div class="day-date">${date.getDate()}</div>
+            <div class="day-count">${dayData.count}</div>
+            <div class="day-hours">${(dayData.minutes / 60).toFixed(1)} hrs</div>
+        `;
+        container.appendChild(div);
+    }
+
+    // Render segment breakdown
+    const segContainer = document.getElementById('week-segments');
+    segContainer.innerHTML = '';
+
+    data.segments.forEach(seg => {
+        const percentage = Math.round((seg.count / data.total_pomodoros) * 100) || 0;
+        const div = document.createElement('div');
+        div.className = 'segment-row';
+        div.innerHTML = `
+            <div class="color-dot" style="background: ${seg.color}"></div>
+            <div class="name">${seg.name}</div>
+            <div class="count">${seg.count} cycles</div>
+            <div class="percentage">${percentage}%</div>
+        `;
+        segContainer.appendChild(div);
+    });
+}
+
+// Load month view data
+async function loadMonthData() {
+    const response = await fetch('/api/month');
+    const data = await response.json();
+
+    document.getElementById('month-cycles').textContent = data.total_pomodoros;
+    document.getElementById('month-hours').textContent = data.total_hours;
+    document.getElementById('month-best').textContent = data.best_day_count;
+    document.getElementById('month-title').textContent = data.month_name;
+
+    // Render calendar heatmap
+    const container = document.getElementById('calendar-grid');
+    container.innerHTML = '';
+
+    const firstDay = new Date(data.month_start + 'T00:00:00');
+    const lastDay = new Date(data.month_end + 'T00:00:00');
+    const startDayOfWeek = firstDay.getDay() === 0 ? 6 : firstDay.getDay() - 1; // Monday = 0
+
+    // Add empty cells for days before month starts
+    for (let i = 0; i < startDayOfWeek; i++) {
+        const div = document.createElement('div');
+        div.className = 'calendar-day';
+        container.appendChild(div);
+    }
+
+    // Add days of month
+    const currentDate = new Date(firstDay);
+    while (currentDate <= lastDay) {
+        const dateStr = localDateString(currentDate);
+        const dayData = data.daily[dateStr] || { count: 0 };
+
+        // Calculate intensity (0-5 based on count)
+        let intensity = 0;
+        if (dayData.count > 0) intensity = 1;
+        if (dayData.count >= 3) intensity = 2;
+        if (dayData.count >= 5) intensity = 3;
+        if (dayData.count >= 7) intensity = 4;
+        if (dayData.count >= 10) intensity = 5;
+
+        const div = document.createElement('div');
+        div.className = `calendar-day intensity-${intensity}`;
+        div.innerHTML = `
+            <div class="date">${currentDate.getDate()}</div>
+            <div class="count">${dayData.count}</div>
+        `;
+        container.appendChild(div);
+
+        currentDate.setDate(currentDate.getDate() + 1);
+    }
+
+    // Render segment breakdown
+    const segContainer = document.getElementById('month-segments');
+    segContainer.innerHTML = '';
+
+    data.segments.forEach(seg => {
+        const percentage = Math.round((seg.count / data.total_pomodoros) * 100) || 0;
+        const div = document.createElement('div');
+        div.className = 'segment-row';
+        div.innerHTML = `
+            <div class="color-dot" style="background: ${seg.color}"></div>
+            <div class="name">${seg.name}</div>
+            <div class="count">${seg.count} cycles</div>
+            <div class="percentage">${percentage}%</div>
+        `;
+        segContainer.appendChild(div);
+    });
+}
+
+// Search view: results are fetched a page at a time as the user types
+let searchPage = 1;
+let searchTimer = null;
+
+async function loadSearchData() {
+    const select = document.getElementById('search-segment');
+    if (select.options.length === 1) {
+        const response = await fetch('/api/search');
+        const data = await response.json();
+        Object.values(data.segments).forEach(seg => {
+            select.add(new Option(seg.name, seg.id));
+        });
+    }
+    runSearch(1);
+}
+
+async function runSearch(page) {
+    const query = document.getElementById('search-input').value.trim();
+    const segment = document.getElementById('search-segment').value;
+    const container = document.getElementById('search-results');
+    const summary = document.getElementById('search-summary');
+    const more = document.getElementById('search-more');
+
+    if (!query) {
+        container.innerHTML = '';
+        summary.textContent = '';
+        more.style.display = 'none';
+        return;
+    }
+
+    const params = new URLSearchParams({ q: query, page: page });
+    if (segment) params.set('segment', segment);
+    const response = await fetch('/api/search?' + params);
+    const data = await response.json();
+
+    // Drop answers to a query the user has since typed past
+    if (query !== document.getElementById('search-input').value.trim()) return;
+
+    searchPage = page;
+    if (page === 1) container.innerHTML = '';
+    summary.textContent = `${data.total} matching session${data.total === 1 ? '' : 's'}`;
+
+    data.results.forEach(session => {
+        const seg = data.segments[session.segment_id] || { name: '', color: '#666666' };
+        const when = new Date(session.started_at).toLocaleString('en-US', {
+            year: 'numeric',
+            month: 'short',
+            day: 'numeric',
+            hour: 'numeric',
+            minute: '2-digit'
+        });
+        const div = document.createElement('div');
+        div.className = 'session-item';
+        div.style.borderLeftColor = seg.color;
+        div.innerHTML = `
+            <div class="time">${when}</div>
+            <div class="segment-name">${seg.name}</div>
+            <div class="description">${session.snippet_html}</div>
+        `;
+        container.appendChild(div);
+    });
+
+    more.style.display = data.offset + data.results.length < data.total ? 'block' : 'none';
+}
+
+document.getElementById('search-input').addEventListener('input', () => {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => runSearch(1), 200);
+});
+document.getElementById('search-segment').addEventListener('change', () => runSearch(1));
+
+// Initial load
+loadDayData();
+
+function refreshActiveTab() {
+    const activeTab = document.querySelector('.tab.active').textContent.toLowerCase();
+    if (activeTab === 'day') loadDayData();
+    else if (activeTab === 'week') loadWeekData();
+    else if (activeTab === 'month') loadMonthData();
+    else if (activeTab === 'search') runSearch(1);
+}
+
+// Refresh when the server reports new data; poll every 30 seconds only
+// while the live stream is unavailable
+let pollTimer = null;
+
+function startPolling() {
+    if (!pollTimer) pollTimer = setInterval(refreshActiveTab, 30000);
+}
+
+function stopPolling() {
+    clearInterval(pollTimer);
+    pollTimer = null;
+}
+
+if (window.EventSource) {
+    const stream = new EventSource('/api/stream');
+    stream.addEventListener('change', refreshActiveTab);
+    stream.onopen = () => {
+        // Catch up on anything missed while disconnected
+        if (pollTimer) refreshActiveTab();
+        stopPolling();
+    };
+    stream.onerror = startPolling;
+} else {
+    startPolling();
+}
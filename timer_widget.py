@@ -3,14 +3,16 @@ Pomodoro Timer Widget - Clean Dark UI
 Fixed: Using Label widgets for buttons (reliable on macOS)
 """
 
+import logging
 import tkinter as tk
 from tkinter import ttk
-import threading
+import math
 import time
 from datetime import datetime
-import platform
-import subprocess
-from database import get_segments, save_session, get_today_stats
+from database import get_segments, get_session_writer, get_today_stats
+from notifier import Notifier
+
+logger = logging.getLogger(__name__)
 
 
 class PomodoroTimer:
@@ -19,6 +21,10 @@ class PomodoroTimer:
     PAUSED = "paused"
     BREAK = "break"
     
+    # Wall clock running this far ahead of the monotonic clock means the machine
+    # was suspended (the monotonic clock stops during sleep on macOS and Linux)
+    SUSPEND_THRESHOLD = 2.0
+    
     # Compact square dimensions
     WIDGET_WIDTH = 120
     WIDGET_HEIGHT = 85
@@ -40,17 +46,22 @@ class PomodoroTimer:
         self.state = self.IDLE
         self.session_start_time = None
         
+        # Countdown engine: deadlines on both clocks, one pending Tk callback
+        self._deadline = None
+        self._wall_deadline = None
+        self._tick_job = None
+        self._paused_remaining = None
+        self._paused_state = None
+        self._raise_job = None
+        
         self.segments = get_segments()
         self.current_segment_idx = 0
+        self.notifier = Notifier()
         
         self._setup_window()
         self._create_widgets()
         self._position_window()
         
-        self.timer_thread = None
-        self.running = True
-        self._keep_on_top()
-        
     def _setup_window(self):
         """Configure window properties."""
         self.root.overrideredirect(True)
@@ -63,7 +74,9 @@ class PomodoroTimer:
         
         self.root.bind('<Button-1>', self._start_drag)
         self.root.bind('<B1-Motion>', self._drag)
-        self.root.bind('<FocusOut>', lambda e: self.root.lift())
+        # Stay on top by reacting to focus/visibility changes, not by polling
+        self.root.bind('<FocusOut>', self._raise_soon)
+        self.root.bind('<Visibility>', self._on_visibility)
         
     def _position_window(self):
         """Position at bottom-right corner."""
@@ -189,7 +202,8 @@ class PomodoroTimer:
             state='readonly',
             width=7,
             style='Dark.TCombobox',
-            font=('SF Pro', 10)
+            font=('SF Pro', 10),
+            postcommand=self._refresh_segments
         )
         self.segment_dropdown.pack(side='left')
         self.segment_dropdown.bind('<<ComboboxSelected>>', self._on_segment_change)
@@ -226,6 +240,15 @@ class PomodoroTimer:
         )
         self.dash_btn.pack()
         
+    def _refresh_segments(self):
+        """Pick up segments added since startup, just before the dropdown opens."""
+        current_id = self.segments[self.current_segment_idx]['id'] if self.segments else None
+        self.segments = get_segments()
+        self.segment_dropdown['values'] = [s['name'] for s in self.segments]
+        self.current_segment_idx = next(
+            (i for i, seg in enumerate(self.segments) if seg['id'] == current_id), 0
+        )
+        
     def _on_segment_change(self, event=None):
         """Handle segment change."""
         selected = self.segment_var.get()
@@ -248,37 +271,29 @@ class PomodoroTimer:
             
     def _start_timer(self):
         """Start timer."""
-        # Stop any existing timer loop first
-        self.state = self.IDLE
-        time.sleep(0.1)  # Give existing thread time to exit
-        
         self.session_start_time = datetime.now()
-        self.time_remaining = self.work_duration
         self.state = self.RUNNING
         self.play_btn.config(text="⏸")
         self.time_label.config(fg=self.FG)  # White for work
-        
-        # Only start new thread if none is running
-        if self.timer_thread is None or not self.timer_thread.is_alive():
-            self.timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
-            self.timer_thread.start()
+        self._start_countdown(self.work_duration)
         
     def _pause_timer(self):
         """Pause timer."""
+        self._paused_remaining = self._seconds_left()
+        self._paused_state = self.state
+        self._cancel_tick()
         self.state = self.PAUSED
         self.play_btn.config(text="▶")
         
     def _resume_timer(self):
         """Resume timer."""
-        self.state = self.RUNNING
+        self.state = self._paused_state or self.RUNNING
         self.play_btn.config(text="⏸")
-        
-        if self.timer_thread is None or not self.timer_thread.is_alive():
-            self.timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
-            self.timer_thread.start()
+        self._start_countdown(self._paused_remaining)
         
     def _reset_timer(self):
         """Reset timer."""
+        self._cancel_tick()
         self.state = self.IDLE
         self.time_remaining = self.work_duration
         self.session_start_time = None
@@ -286,25 +301,46 @@ class PomodoroTimer:
         self.play_btn.config(text="▶")
         self.time_label.config(fg=self.FG)
         
-    def _timer_loop(self):
-        """Background timer."""
-        while self.running:
-            if self.state == self.RUNNING or self.state == self.BREAK:
-                if self.time_remaining > 0:
-                    self.time_remaining -= 1
-                    self.root.after(0, self._update_time_display)
-                else:
-                    if self.state == self.RUNNING:
-                        self.root.after(0, self._timer_complete)
-                    else:
-                        self.root.after(0, self._break_complete)
-                    return
-                time.sleep(1)
-            elif self.state == self.IDLE or self.state == self.PAUSED:
-                # Exit thread when idle or paused - will be restarted when needed
-                return
+    def _start_countdown(self, seconds: float):
+        """Count down from seconds on the Tk event loop."""
+        self._cancel_tick()
+        self._deadline = time.monotonic() + seconds
+        self._wall_deadline = time.time() + seconds
+        self._tick()
+        
+    def _seconds_left(self) -> float:
+        """Time left, recomputed from the clocks rather than accumulated."""
+        left = self._deadline - time.monotonic()
+        wall_left = self._wall_deadline - time.time()
+        if left - wall_left > self.SUSPEND_THRESHOLD:
+            # Slept while counting down: the time asleep still counts
+            self._deadline -= left - wall_left
+            left = wall_left
+        return left
+        
+    def _tick(self):
+        """Refresh the display, then sleep until the shown second changes."""
+        self._tick_job = None
+        left = self._seconds_left()
+        if left <= 0:
+            self.time_remaining = 0
+            self._update_time_display()
+            if self.state == self.BREAK:
+                self._break_complete()
             else:
-                time.sleep(0.1)
+                self._timer_complete()
+            return
+        
+        self.time_remaining = math.ceil(left)
+        self._update_time_display()
+        delay = left - (self.time_remaining - 1)
+        self._tick_job = self.root.after(max(1, math.ceil(delay * 1000)), self._tick)
+        
+    def _cancel_tick(self):
+        """Drop the pending countdown callback, if any."""
+        if self._tick_job is not None:
+            self.root.after_cancel(self._tick_job)
+            self._tick_job = None
             
     def _timer_complete(self):
         """Work timer done."""
@@ -382,14 +418,15 @@ class PomodoroTimer:
         def save_and_break():
             desc = desc_entry.get().strip() or "No description"
             if self.session_start_time:
-                save_session(segment['id'], desc, 25, self.session_start_time)
+                # Committed by the background writer; the UI never waits on disk
+                get_session_writer().submit(segment['id'], desc, 25, self.session_start_time)
             dialog.destroy()
             self._start_break()
             
         def save_and_skip():
             desc = desc_entry.get().strip() or "No description"
             if self.session_start_time:
-                save_session(segment['id'], desc, 25, self.session_start_time)
+                get_session_writer().submit(segment['id'], desc, 25, self.session_start_time)
             dialog.destroy()
             # Start next work cycle immediately instead of just resetting
             self._start_timer()
@@ -421,14 +458,10 @@ class PomodoroTimer:
         
     def _start_break(self):
         """Start break."""
-        self.time_remaining = self.break_duration
         self.state = self.BREAK
         self.time_label.config(fg='#3498db')  # Blue for break
-        self._update_time_display()
         self.play_btn.config(text="⏸")
-        
-        self.timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
-        self.timer_thread.start()
+        self._start_countdown(self.break_duration)
         
     def _update_time_display(self):
         """Update display."""
@@ -437,17 +470,15 @@ class PomodoroTimer:
         self.time_label.config(text=f"{mins:02d}:{secs:02d}")
         
     def _play_notification_sound(self):
-        """Play sound."""
-        if platform.system() == 'Darwin':
-            subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], capture_output=True)
+        """Play sound (in the background)."""
+        if self.notifier.plays_sound:
+            self.notifier.play_sound()
         else:
             self.root.bell()
             
     def _notify(self, title: str, message: str):
-        """System notification."""
-        if platform.system() == 'Darwin':
-            script = f'display notification "{message}" with title "{title}"'
-            subprocess.run(['osascript', '-e', script], capture_output=True)
+        """System notification (in the background)."""
+        self.notifier.notify(title, message)
             
     def _open_dashboard(self):
         """Open dashboard."""
@@ -480,17 +511,35 @@ class PomodoroTimer:
     def _restore(self):
         """Restore."""
         self.root.deiconify()
-        self.root.lift()
+        self._raise_window()
+    
+    def _on_visibility(self, event):
+        """Raise again once something covers the widget."""
+        if event.state != 'VisibilityUnobscured':
+            self._raise_soon()
+    
+    def _raise_soon(self, event=None):
+        """Coalesce a burst of focus/visibility events into one raise."""
+        if self._raise_job is None:
+            self._raise_job = self.root.after_idle(self._raise_window)
     
-    def _keep_on_top(self):
+    def _raise_window(self):
         """Stay on top."""
+        self._raise_job = None
         self.root.lift()
         self.root.attributes('-topmost', True)
-        self.root.after(500, self._keep_on_top)
     
     def _quit(self):
         """Quit."""
-        self.running = False
+        self._cancel_tick()
+        try:
+            get_session_writer().close(timeout=5)
+        except Exception:
+            # A failed or stuck save must not stop the widget from closing
+            logger.exception("Queued sessions were not all saved")
+        self.notifier.shutdown()
+        if self._raise_job is not None:
+            self.root.after_cancel(self._raise_job)
         self.root.quit()
         self.root.destroy()
         